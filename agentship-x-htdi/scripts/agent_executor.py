@@ -24,35 +24,23 @@ import sys
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 from utils import read_md, write_md, get_agents_root
+import session_store
+import task_ledger
+import task_store
+from task_store import parse_project_tasks
 
 
 def parse_tasks(tasks_md_content):
     """Parse tasks from tasks.md markdown file."""
-    tasks = []
+    return parse_project_tasks(tasks_md_content)
 
-    # Pattern to match task rows in markdown table
-    pattern = r'\|\s*([A-Z]+-\d+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|'
 
-    for match in re.finditer(pattern, tasks_md_content):
-        task_id = match.group(1).strip()
-        title = match.group(2).strip()
-        description = match.group(3).strip()
-        priority = match.group(4).strip()
-        status = match.group(5).strip()
-        dependencies = match.group(6).strip()
-        estimate = match.group(7).strip()
-
-        tasks.append({
-            'id': task_id,
-            'title': title,
-            'description': description,
-            'priority': priority.lower(),
-            'status': status.lower(),
-            'dependencies': [d.strip() for d in dependencies.split(',') if d.strip() and d.strip() != '-'],
-            'estimate': estimate
-        })
-
-    return tasks
+def load_tasks(project_path, tasks_file):
+    """Load project tasks from the OPENTASKS.json store, parsing tasks.md only when it is stale."""
+    tasks = task_store.project_tasks(project_path)
+    if tasks is not None:
+        return tasks
+    return parse_tasks(read_md(tasks_file))
 
 
 def get_available_tasks(tasks):
@@ -116,9 +104,7 @@ _Auto-generated on {generated_on}. Replace the prompts below with your completed
 
 
 def create_session_log(project_path, task, agent_codename=None):
-    """Create a session log file for the task."""
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    session_file = project_path / 'sessions' / f"{timestamp}-{task['id']}.md"
+    """Create a session log for the task in the date-sharded session store."""
     agent_label = agent_codename if agent_codename else "[Your codename]"
 
     content = f"""# Session Log - {task['id']}
@@ -184,7 +170,7 @@ def create_session_log(project_path, task, agent_codename=None):
 **Summary:** [Brief summary of what was accomplished]
 """
 
-    write_md(session_file, content)
+    _, session_file = session_store.create_session(project_path, content, [task['id']], label=task['id'])
     return session_file
 
 
@@ -324,6 +310,8 @@ def main():
     parser.add_argument('--list', action='store_true', help='List available tasks')
     parser.add_argument('--all', action='store_true', help='Show all tasks (use with --list)')
     parser.add_argument('--agent', help='Codename of the human agent who will continue the task')
+    parser.add_argument('--ledger', action='store_true',
+                        help='Read and update tasks through the SQLite ledger (see task_ledger.py)')
 
     args = parser.parse_args()
 
@@ -341,8 +329,15 @@ def main():
         sys.exit(1)
 
     # Parse tasks
-    tasks_content = read_md(tasks_file)
-    tasks = parse_tasks(tasks_content)
+    ledger = None
+    if args.ledger:
+        ledger = task_ledger.connect()
+        tasks = task_ledger.project_tasks(ledger, args.project)
+        if not tasks:
+            task_ledger.import_project(ledger, project_path)
+            tasks = task_ledger.project_tasks(ledger, args.project)
+    else:
+        tasks = load_tasks(project_path, tasks_file)
 
     if not tasks:
         print("Error: No tasks found in tasks.md")
@@ -377,12 +372,14 @@ def main():
 
     elif args.auto_pick:
         # Auto-pick highest priority available task
-        available = get_available_tasks(tasks)
-        if not available:
+        if ledger is not None:
+            prioritized = task_ledger.available_tasks(ledger, args.project, limit=1)
+        else:
+            prioritized = prioritize_tasks(get_available_tasks(tasks))
+        if not prioritized:
             print("No tasks available. All tasks either completed or blocked by dependencies.")
             sys.exit(0)
 
-        prioritized = prioritize_tasks(available)
         selected_task = prioritized[0]
 
         print(f"Auto-picked task: {selected_task['id']} - {selected_task['title']}")
@@ -403,6 +400,13 @@ def main():
     print(f"PREPARING TASK: {selected_task['id']}")
     print(f"{'='*80}\n")
 
+    previous_sessions = session_store.sessions_for_task(project_path, selected_task['id'])
+    if previous_sessions:
+        print(f"Previous sessions for {selected_task['id']}:")
+        for path in previous_sessions:
+            print(f"  - {path.relative_to(agents_root)}")
+        print()
+
     session_file = create_session_log(project_path, selected_task, agent_codename)
     print(f"✓ Created session log: {session_file.relative_to(agents_root)}")
 
@@ -411,7 +415,11 @@ def main():
     print(f"✓ Created implementation prompt: {prompt_file.relative_to(agents_root)}")
 
     # Update task status to in_progress
-    update_task_status(tasks_file, selected_task['id'], 'In Progress')
+    if ledger is not None:
+        task_ledger.set_status(ledger, args.project, selected_task['id'], 'In Progress')
+        task_ledger.export_project(ledger, project_path)
+    else:
+        update_task_status(tasks_file, selected_task['id'], 'In Progress')
     print(f"✓ Updated task status to 'In Progress'")
 
     print(f"\n{'='*80}")
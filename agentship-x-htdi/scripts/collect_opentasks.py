@@ -3,12 +3,23 @@
 
 from __future__ import annotations
 
+import argparse
+import heapq
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import sys
 
+import task_store
 from utils import (
     AGENTS_DIR,
+    CACHE_DIR,
+    file_digest,
+    load_json_cache,
     project_display_name,
+    save_json_cache,
     section_lines,
     parse_markdown_table,
     today,
@@ -17,6 +28,17 @@ from utils import (
 )
 
 TARGET_FILE = AGENTS_DIR / "OPENTASKS.md"
+PROJECTS_DIR = AGENTS_DIR / "projects"
+CACHE_FILE = CACHE_DIR / "opentasks.json"
+CACHE_VERSION = 1
+
+COLUMNS = ["Project", "Status", "ID", "Title", "Description", "Priority", "Owner", "Notes"]
+STATUS_WEIGHT = {"In Progress": 0, "Backlog": 1}
+# Shipping rows back from a worker costs ~0.2 ms per project against ~0.42 ms to
+# parse it in-process, plus ~0.1 s of pool setup, so the pool only pays off with
+# at least 4 usable CPUs and roughly 1000+ projects. Below that, parse serially.
+POOL_MIN_PROJECTS = 1000
+POOL_MIN_WORKERS = 4
 
 
 def extract_tasks(tasks_path: Path, project_name: str) -> list[dict[str, str]]:
@@ -46,19 +68,146 @@ def extract_tasks(tasks_path: Path, project_name: str) -> list[dict[str, str]]:
     return tasks
 
 
-def main() -> int:
-    projects_dir = AGENTS_DIR / "projects"
-    all_tasks: list[dict[str, str]] = []
+def row_sort_key(row: dict[str, str]) -> tuple:
+    """Sort by project then status then ID."""
+    return (row["Project"].lower(), STATUS_WEIGHT.get(row["Status"], 99), row["ID"])
 
-    for project_dir in sorted(projects_dir.iterdir()):
-        if not project_dir.is_dir():
-            continue
-        tasks_md = project_dir / "tasks.md"
-        if not tasks_md.exists():
-            continue
-        project_name = project_display_name(project_dir)
-        all_tasks.extend(extract_tasks(tasks_md, project_name))
 
+def project_dirs(projects_dir: Path = PROJECTS_DIR) -> list[Path]:
+    """Project folders that carry a tasks.md, in name order."""
+    return [
+        project_dir
+        for project_dir in sorted(projects_dir.iterdir())
+        if project_dir.is_dir() and (project_dir / "tasks.md").exists()
+    ]
+
+
+def collect_project(project_dir: Path) -> list[dict[str, str]]:
+    """Extract and sort the open rows of a single project."""
+    project_name = project_display_name(project_dir)
+    rows = extract_tasks(project_dir / "tasks.md", project_name)
+    return sorted(rows, key=row_sort_key)
+
+
+def _project_row_tuples(project_dir: str) -> list[tuple[str, ...]]:
+    """Pool worker: return a project's rows as compact tuples in COLUMNS order."""
+    return [tuple(row[column] for column in COLUMNS) for row in collect_project(Path(project_dir))]
+
+
+def extract_projects(
+    dirs: list[Path],
+    workers: int = 1,
+    min_projects: int = POOL_MIN_PROJECTS,
+) -> list[list[dict[str, str]]]:
+    """
+    Extract sorted rows for each project, preserving the order of `dirs`.
+
+    With at least `POOL_MIN_WORKERS` workers and `min_projects` projects,
+    parsing is spread across a process pool in batches; the workers ship back
+    plain tuples to keep pickling small.
+    """
+    if workers < POOL_MIN_WORKERS or len(dirs) < max(min_projects, 2):
+        return [collect_project(project_dir) for project_dir in dirs]
+    chunksize = max(1, len(dirs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_project_row_tuples, [str(d) for d in dirs], chunksize=chunksize)
+        return [[dict(zip(COLUMNS, values)) for values in rows] for rows in results]
+
+
+def collect_all(
+    projects_dir: Path = PROJECTS_DIR,
+    workers: int = 1,
+    min_projects: int = POOL_MIN_PROJECTS,
+) -> list[dict[str, str]]:
+    """Full rebuild: parse every project."""
+    blocks = extract_projects(project_dirs(projects_dir), workers, min_projects)
+    return list(heapq.merge(*blocks, key=row_sort_key))
+
+
+def collect_incremental(
+    projects_dir: Path = PROJECTS_DIR,
+    workers: int = 1,
+) -> tuple[list[dict[str, str]], int]:
+    """
+    Re-extract only projects whose tasks.md/README.md changed since the last run.
+
+    Each project's rows are cached already sorted, so the ledger is produced by
+    merging per-project runs instead of re-sorting every row.
+    Returns the merged rows and the number of re-extracted projects.
+    """
+    cache = load_json_cache(CACHE_FILE, CACHE_VERSION).get("projects", {})
+    dirs = project_dirs(projects_dir)
+    fingerprints: dict[str, str] = {}
+    blocks: dict[str, list[dict[str, str]]] = {}
+    stale: list[Path] = []
+
+    for project_dir in dirs:
+        fingerprint = file_digest(project_dir / "tasks.md", project_dir / "README.md")
+        fingerprints[project_dir.name] = fingerprint
+        cached = cache.get(project_dir.name)
+        if cached and cached.get("hash") == fingerprint:
+            blocks[project_dir.name] = [dict(zip(COLUMNS, values)) for values in cached["rows"]]
+        else:
+            stale.append(project_dir)
+
+    for project_dir, rows in zip(stale, extract_projects(stale, workers)):
+        blocks[project_dir.name] = rows
+
+    if stale or set(fingerprints) != set(cache):
+        fresh = {
+            name: {
+                "hash": fingerprints[name],
+                "rows": [[row[column] for column in COLUMNS] for row in blocks[name]],
+            }
+            for name in fingerprints
+        }
+        save_json_cache(CACHE_FILE, {"projects": fresh}, CACHE_VERSION)
+    merged = heapq.merge(*(blocks[project_dir.name] for project_dir in dirs), key=row_sort_key)
+    return list(merged), len(stale)
+
+
+def _write_synthetic_projects(root: Path, count: int, tasks_per_project: int) -> None:
+    """Populate `root` with `count` fake project folders for benchmarking."""
+    header = "| ID | Title | Description | Priority | Owner | Notes |\n| --- | --- | --- | --- | --- | --- |\n"
+    for idx in range(count):
+        project_dir = root / f"bench-{idx:05d}"
+        project_dir.mkdir(parents=True)
+        (project_dir / "README.md").write_text(
+            f"# Bench Project {idx}\n\nSynthetic project used by the extraction benchmark.\n",
+            encoding="utf-8",
+        )
+        rows = "".join(
+            f"| B{idx}-{n:03d} | Task {n} | Synthetic row | High | — | |\n" for n in range(tasks_per_project)
+        )
+        (project_dir / "tasks.md").write_text(
+            f"# Tasks\n\n## Backlog\n\n{header}{rows}\n## In Progress\n\n{header}{rows}\n## Done\n",
+            encoding="utf-8",
+        )
+
+
+def run_benchmark(project_count: int, worker_counts: list[int]) -> int:
+    """Time full extraction over a synthetic tree at several worker counts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _write_synthetic_projects(root, project_count, tasks_per_project=20)
+        baseline_rows = None
+        baseline_seconds = None
+        print(f"Extraction benchmark: {project_count} projects, {os.cpu_count()} CPU(s), pool forced on")
+        for workers in worker_counts:
+            started = time.perf_counter()
+            rows = collect_all(root, workers, min_projects=0)
+            elapsed = time.perf_counter() - started
+            if baseline_rows is None:
+                baseline_rows, baseline_seconds = rows, elapsed
+            elif rows != baseline_rows:
+                print(f"  workers={workers}: output differs from workers={worker_counts[0]}")
+                return 1
+            speedup = baseline_seconds / elapsed if elapsed else float("inf")
+            print(f"  workers={workers:>3}: {elapsed:8.3f}s  rows={len(rows)}  speedup x{speedup:.2f}")
+    return 0
+
+
+def render_ledger(rows: list[dict[str, str]]) -> str:
     header = [
         "# Open Tasks Ledger",
         "",
@@ -66,23 +215,56 @@ def main() -> int:
         "",
     ]
 
-    if not all_tasks:
+    if not rows:
         header.append("No open tasks found. Update `tasks.md` files to populate this view.\n")
-        write_md(TARGET_FILE, "\n".join(header))
-        print("No open tasks to record.")
-        return 0
+        return "\n".join(header)
+
+    lines = header + [markdown_table(rows, COLUMNS)]
+    lines.append("\n> Generated via `agents/scripts/collect_opentasks.py`.")
+    return "\n".join(lines)
+
 
-    columns = ["Project", "Status", "ID", "Title", "Description", "Priority", "Owner", "Notes"]
-    # Sort by project then status
-    status_weight = {"In Progress": 0, "Backlog": 1}
-    sorted_rows = sorted(
-        all_tasks,
-        key=lambda r: (r["Project"].lower(), status_weight.get(r["Status"], 99), r["ID"]),
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild agentship-x-htdi/OPENTASKS.md.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Reuse cached rows for unchanged projects ({CACHE_FILE.relative_to(AGENTS_DIR)})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Parse projects across a process pool of up to this many CPUs (0 = all). "
+            f"The pool is only used with at least {POOL_MIN_WORKERS} CPUs and "
+            f"{POOL_MIN_PROJECTS} projects; below that it is slower than parsing serially"
+        ),
     )
-    lines = header + [markdown_table(sorted_rows, columns)]
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        metavar="PROJECTS",
+        help="Benchmark extraction on a synthetic tree with 1, 4 and 16 workers and exit",
+    )
+    args = parser.parse_args(argv)
+    workers = min(args.workers or os.cpu_count() or 1, os.cpu_count() or 1)
 
-    lines.append("\n> Generated via `agents/scripts/collect_opentasks.py`.")
-    write_md(TARGET_FILE, "\n".join(lines))
+    if args.benchmark:
+        return run_benchmark(args.benchmark, [1, 4, 16])
+
+    if args.incremental:
+        all_tasks, changed = collect_incremental(workers=workers)
+        print(f"Re-extracted {changed} changed project(s).")
+    else:
+        all_tasks = collect_all(workers=workers)
+
+    write_md(TARGET_FILE, render_ledger(all_tasks))
+    store = task_store.build_store(all_tasks, COLUMNS, project_dirs(), previous=task_store.load_store())
+    task_store.write_store(store, TARGET_FILE)
+    if not all_tasks:
+        print("No open tasks to record.")
+        return 0
     print(f"Updated {TARGET_FILE.relative_to(AGENTS_DIR)}")
     return 0
 
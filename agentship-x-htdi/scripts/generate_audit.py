@@ -3,19 +3,77 @@
 
 from __future__ import annotations
 
+import argparse
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import session_analytics
 from utils import (
     AGENTS_DIR,
     TEMPLATES_DIR,
     ensure_dir,
-    project_display_name,
-    read_readme_summary,
+    project_readme_info,
     today,
     write_md,
 )
 
+FOOTER = "\n> Generated by `agents/scripts/generate_audit.py`.\n"
+SUMMARY_MARKER = "\n---\n"
+
+# (placeholder in AUDIT-log.md, slot name, format applied to the slot value)
+TEMPLATE_SLOTS = (
+    ("# Project — AUDIT Log", "project_name", "# {} — AUDIT Log"),
+    ("**Date:** YYYY-MM-DD", "date", "**Date:** {}"),
+    ("**LLM Auditor:** [Name / Model]", "auditor", "**LLM Auditor:** {}"),
+    ("**Project:** [Project Name]", "project_name", "**Project:** {}"),
+    ("**Author:** [Your Name]", "author", "**Author:** {}"),
+)
+
+
+class AuditTemplate:
+    """
+    AUDIT-log template compiled into literal chunks and named slots.
+
+    Placeholders (first occurrence each) and the summary insertion point before
+    the first `---` rule are located once; `render` then joins the pieces in a
+    single pass.
+    """
+
+    def __init__(self, raw: str) -> None:
+        cuts: list[tuple[int, int, str, str]] = []
+        for placeholder, slot, fmt in TEMPLATE_SLOTS:
+            pos = raw.find(placeholder)
+            if pos >= 0:
+                cuts.append((pos, len(placeholder), slot, fmt))
+        marker_pos = raw.find(SUMMARY_MARKER)
+        if marker_pos >= 0:
+            cuts.append((marker_pos, 0, "summary", "\n\n{}"))
+        cuts.sort()
+
+        self._parts: list[tuple[str, str | None, str]] = []
+        cursor = 0
+        for pos, length, slot, fmt in cuts:
+            self._parts.append((raw[cursor:pos], slot, fmt))
+            cursor = pos + length
+        self._tail = raw[cursor:]
+        self._summary_at_end = marker_pos < 0
+
+    def render(self, **values: str) -> str:
+        pieces: list[str] = []
+        for literal, slot, fmt in self._parts:
+            pieces.append(literal)
+            pieces.append(fmt.format(values[slot]))
+        pieces.append(self._tail)
+        if self._summary_at_end:
+            pieces.append(f"\n\n{values['summary']}")
+        content = "".join(pieces)
+        if FOOTER not in content:
+            content = f"{content.rstrip()}{FOOTER}"
+        return content
+
 
 def load_template() -> str:
     template_path = TEMPLATES_DIR / "AUDIT-log.md"
@@ -24,9 +82,13 @@ def load_template() -> str:
     return template_path.read_text(encoding="utf-8")
 
 
-def build_summary_block(project_dir: Path) -> str:
-    readme = project_dir / "README.md"
-    summary = read_readme_summary(readme)
+def build_summary_block(
+    project_dir: Path,
+    summary: str | None = None,
+    metrics: dict | None = None,
+) -> str:
+    if summary is None:
+        summary = project_readme_info(project_dir)[1]
     tasks_path = project_dir / "tasks.md"
     sessions_path = project_dir / "sessions"
 
@@ -39,54 +101,92 @@ def build_summary_block(project_dir: Path) -> str:
         f"- Tasks — `{tasks_path.relative_to(AGENTS_DIR)}`",
         f"- Sessions — `{sessions_path.relative_to(AGENTS_DIR)}/`",
         "",
+        *session_analytics.render_metrics_lines(metrics),
+        "",
     ]
     return "\n".join(lines)
 
 
-def render_project_audit(project_dir: Path, template: str) -> str:
-    project_name = project_display_name(project_dir)
-    replacements = {
-        "# Project — AUDIT Log": f"# {project_name} — AUDIT Log",
-        "**Date:** YYYY-MM-DD": f"**Date:** {today()}",
-        "**LLM Auditor:** [Name / Model]": "**LLM Auditor:** Automation Sync",
-        "**Project:** [Project Name]": f"**Project:** {project_name}",
-        "**Author:** [Your Name]": "**Author:** Agent Automation",
-    }
-    content = template
-    for src, dst in replacements.items():
-        content = content.replace(src, dst, 1)
-
-    summary_block = build_summary_block(project_dir)
-    marker = "\n---\n"
-    if marker in content:
-        head, tail = content.split(marker, 1)
-        content = f"{head}\n\n{summary_block}{marker}{tail}"
-    else:
-        content = f"{content}\n\n{summary_block}"
-
-    footer = "\n> Generated by `agents/scripts/generate_audit.py`.\n"
-    if footer not in content:
-        content = f"{content.rstrip()}{footer}"
-    return content
-
-
-def main() -> int:
+def render_project_audit(
+    project_dir: Path,
+    template: str | AuditTemplate,
+    metrics: dict | None = None,
+) -> str:
+    """Render one audit; session metrics are computed (through the cache) when not supplied."""
+    if isinstance(template, str):
+        template = AuditTemplate(template)
+    if metrics is None:
+        metrics = session_analytics.collect_metrics([project_dir]).get(project_dir.name)
+    project_name, summary = project_readme_info(project_dir)
+    return template.render(
+        project_name=project_name,
+        date=today(),
+        auditor="Automation Sync",
+        author="Agent Automation",
+        summary=build_summary_block(project_dir, summary, metrics),
+    )
+
+
+_WORKER_TEMPLATE: AuditTemplate | None = None
+
+
+def _init_worker(raw_template: str) -> None:
+    global _WORKER_TEMPLATE
+    _WORKER_TEMPLATE = AuditTemplate(raw_template)
+
+
+def _render_timed(job: tuple[str, dict]) -> tuple[str, str, float]:
+    """Pool worker: render one audit and report how long it took."""
+    project_dir, metrics = job
+    started = time.perf_counter()
+    content = render_project_audit(Path(project_dir), _WORKER_TEMPLATE, metrics)
+    return Path(project_dir).name, content, time.perf_counter() - started
+
+
+def render_all(project_dirs: list[Path], raw_template: str, workers: int = 1) -> list[tuple[str, str, float]]:
+    """Render every project's audit, in `project_dirs` order, optionally across a process pool."""
+    # One cached session scan up front; workers only format the numbers.
+    all_metrics = session_analytics.collect_metrics(project_dirs)
+    jobs = [(str(d), all_metrics.get(d.name, {})) for d in project_dirs]
+    if workers <= 1 or len(project_dirs) <= 1:
+        _init_worker(raw_template)
+        return [_render_timed(job) for job in jobs]
+    chunksize = max(1, len(project_dirs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(raw_template,)) as pool:
+        return list(pool.map(_render_timed, jobs, chunksize=chunksize))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate per-project AUDIT logs.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Render audits across a process pool of this size (0 = one per CPU)",
+    )
+    parser.add_argument("--timing", action="store_true", help="Print per-project render time")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
     projects_dir = AGENTS_DIR / "projects"
     audits_dir = ensure_dir(AGENTS_DIR / "audits")
     template = load_template()
     generated = 0
 
-    for project_dir in sorted(projects_dir.iterdir()):
-        if not project_dir.is_dir():
-            continue
-        content = render_project_audit(project_dir, template)
-        output_path = audits_dir / f"{project_dir.name}.md"
+    project_dirs = [path for path in sorted(projects_dir.iterdir()) if path.is_dir()]
+    started = time.perf_counter()
+    for name, content, elapsed in render_all(project_dirs, template, workers):
+        if args.timing:
+            print(f"  {name}: {elapsed * 1000:.2f} ms")
+        output_path = audits_dir / f"{name}.md"
         if output_path.exists() and output_path.read_text(encoding="utf-8") == content:
             continue
         write_md(output_path, content)
         generated += 1
-        print(f"✅ audit updated for {project_dir.name}")
+        print(f"✅ audit updated for {name}")
 
+    if args.timing:
+        print(f"Rendered {len(project_dirs)} audit(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
     if not generated:
         print("No audit changes detected.")
     return 0
@@ -3,15 +3,60 @@
 
 from __future__ import annotations
 
+import argparse
+import json
+import os
+import subprocess
 import sys
+import tempfile
+import time
+from pathlib import Path
 
-from utils import AGENTS_DIR, EXCLUDED_DIRS, REPO_ROOT, ensure_dir, today, write_md
+from utils import (
+    AGENTS_DIR,
+    CACHE_DIR,
+    EXCLUDED_DIRS,
+    REPO_ROOT,
+    ensure_dir,
+    load_json_cache,
+    save_json_cache,
+    today,
+    track_path,
+    write_md,
+)
 
 TOP_LEVEL_LIMIT = 8
+ASSET_ROOT = REPO_ROOT / "public" / "assets"
+ASSET_REPORT = AGENTS_DIR / "ASSET_WEIGHTS.md"
+ASSET_SNAPSHOT = AGENTS_DIR / "ASSET_WEIGHTS.json"
+ASSET_TOP_FILES = 10
+TREE_CACHE = CACHE_DIR / "sitemap.json"
+TREE_CACHE_VERSION = 1
+# Directories modified this recently are not cached: a change within the same
+# mtime tick could otherwise go unnoticed on the next run.
+RACY_WINDOW_NS = 2_000_000_000
 
 
-def should_skip(entry: Path) -> bool:
-    name = entry.name
+class DirNode:
+    """A directory in the sitemap tree; children are sorted case-insensitively.
+
+    `files` holds `(name, bytes)` for directories under the asset root only.
+    """
+
+    __slots__ = ("name", "path", "children", "files")
+
+    def __init__(self, name: str, path: str) -> None:
+        self.name = name
+        self.path = path
+        self.children: list[DirNode] = []
+        self.files: list[tuple[str, int]] = []
+
+
+def should_skip(entry: Path | os.DirEntry) -> bool:
+    return _skip_name(entry.name)
+
+
+def _skip_name(name: str) -> bool:
     if name in EXCLUDED_DIRS:
         return True
     if name.startswith(".") and name not in {".github"}:
@@ -19,7 +64,288 @@ def should_skip(entry: Path) -> bool:
     return False
 
 
-def generate_top_level() -> str:
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root + os.sep)
+
+
+def _list_dir(path: str, with_files: bool) -> tuple[list[os.DirEntry], list[tuple[str, int]]]:
+    """Return sorted subdirectories and, when asked, `(name, size)` for regular files."""
+    subdirs: list[os.DirEntry] = []
+    files: list[tuple[str, int]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if should_skip(entry):
+                    continue
+                if entry.is_dir():
+                    subdirs.append(entry)
+                elif with_files and entry.is_file():
+                    files.append((entry.name, entry.stat().st_size))
+    except OSError:
+        return [], []
+    subdirs.sort(key=lambda entry: entry.name.lower())
+    return subdirs, files
+
+
+def scan_tree(root: Path = REPO_ROOT, asset_root: Path | None = ASSET_ROOT) -> DirNode:
+    """
+    Walk `root` once with `os.scandir` and return the directory tree.
+
+    Iterative (no recursion limit) and relies on the cached `DirEntry` type
+    info, so each directory costs one scandir call. File sizes are only
+    collected beneath `asset_root`, for the asset weight report.
+    """
+    asset_prefix = str(asset_root) if asset_root else None
+    root_node = DirNode(root.name, str(root))
+    stack = [root_node]
+    while stack:
+        node = stack.pop()
+        with_files = asset_prefix is not None and _is_within(node.path, asset_prefix)
+        subdirs, node.files = _list_dir(node.path, with_files)
+        for entry in subdirs:
+            child = DirNode(entry.name, entry.path)
+            node.children.append(child)
+            stack.append(child)
+    return root_node
+
+
+def scan_tree_incremental(
+    root: Path = REPO_ROOT,
+    asset_root: Path | None = ASSET_ROOT,
+    cache_path: Path = TREE_CACHE,
+    racy_window_ns: int = RACY_WINDOW_NS,
+) -> tuple[DirNode, int, int]:
+    """
+    Like `scan_tree`, but reuse cached child lists for directories whose mtime is unchanged.
+
+    A directory's mtime only moves when entries are added, removed, or renamed,
+    so an unchanged directory costs one `stat` instead of a `scandir`.
+    Directories under `asset_root` are always re-listed because file sizes can
+    change without touching the directory mtime.
+    Returns the tree plus the number of re-listed and reused directories.
+    """
+    cache = load_json_cache(cache_path, TREE_CACHE_VERSION)
+    entries: dict[str, list] = cache.get("dirs", {}) if cache.get("root") == str(root) else {}
+    fresh: dict[str, list] = {}
+    asset_prefix = str(asset_root) if asset_root else None
+    racy_after = time.time_ns() - racy_window_ns
+    relisted = reused = 0
+
+    root_node = DirNode(root.name, str(root))
+    stack: list[tuple[DirNode, str]] = [(root_node, "")]
+    while stack:
+        node, rel = stack.pop()
+        try:
+            mtime = os.stat(node.path).st_mtime_ns
+        except OSError:
+            continue
+        with_files = asset_prefix is not None and _is_within(node.path, asset_prefix)
+        cached = entries.get(rel)
+        if cached is not None and cached[0] == mtime and not with_files:
+            names = cached[1]
+            reused += 1
+        else:
+            subdirs, node.files = _list_dir(node.path, with_files)
+            names = [entry.name for entry in subdirs]
+            relisted += 1
+        if mtime < racy_after:
+            fresh[rel] = [mtime, names]
+        prefix = f"{rel}/" if rel else ""
+        for name in names:
+            child = DirNode(name, node.path + os.sep + name)
+            node.children.append(child)
+            stack.append((child, prefix + name))
+
+    if fresh != entries:
+        save_json_cache(cache_path, {"root": str(root), "dirs": fresh}, TREE_CACHE_VERSION)
+    return root_node, relisted, reused
+
+
+def scan_git_tree(root: Path = REPO_ROOT, asset_root: Path | None = ASSET_ROOT) -> DirNode:
+    """
+    Build the directory tree from `git ls-files -z` instead of walking the disk.
+
+    Only directories containing tracked files appear, so ignored or untracked
+    trees cost nothing; the work scales with the number of tracked files.
+    Tracked files under `asset_root` are stat'ed for the asset weight report.
+    """
+    asset_prefix = str(asset_root) if asset_root else None
+    listing = subprocess.run(
+        ["git", "ls-files", "-z"],
+        cwd=root,
+        capture_output=True,
+        check=True,
+    ).stdout
+    root_node = DirNode(root.name, str(root))
+    # Maps a relative directory to its node, or None when it (or an ancestor) is skipped.
+    nodes: dict[str, DirNode | None] = {"": root_node}
+    for raw in listing.split(b"\0"):
+        dir_rel, _, file_name = os.fsdecode(raw).rpartition("/")
+        if dir_rel in nodes:
+            _record_git_file(nodes[dir_rel], file_name, asset_prefix)
+            continue
+        parent = root_node
+        prefix = ""
+        for part in dir_rel.split("/"):
+            prefix = f"{prefix}/{part}" if prefix else part
+            if prefix not in nodes:
+                if parent is None or _skip_name(part):
+                    nodes[prefix] = None
+                else:
+                    child = DirNode(part, str(root / prefix))
+                    parent.children.append(child)
+                    nodes[prefix] = child
+            parent = nodes[prefix]
+        _record_git_file(parent, file_name, asset_prefix)
+    for node in nodes.values():
+        if node is not None:
+            node.children.sort(key=lambda child: child.name.lower())
+    return root_node
+
+
+def _record_git_file(node: DirNode | None, name: str, asset_prefix: str | None) -> None:
+    if node is None or not name or asset_prefix is None or _skip_name(name):
+        return
+    if not _is_within(node.path, asset_prefix):
+        return
+    try:
+        node.files.append((name, os.stat(os.path.join(node.path, name)).st_size))
+    except OSError:
+        pass
+
+
+def find_node(tree: DirNode, root: Path, target: Path) -> DirNode | None:
+    """Locate `target` inside a tree scanned from `root`."""
+    try:
+        parts = target.relative_to(root).parts
+    except ValueError:
+        return None
+    node: DirNode | None = tree
+    for part in parts:
+        node = next((child for child in node.children if child.name == part), None)
+        if node is None:
+            return None
+    return node
+
+
+def refresh_dir(tree: DirNode, directory: Path, root: Path = REPO_ROOT, asset_root: Path | None = ASSET_ROOT) -> None:
+    """
+    Re-list one directory of a scanned tree in place after something inside it changed.
+
+    Surviving children keep their subtrees, new subdirectories are scanned,
+    and file sizes are re-read under `asset_root`. A directory missing from
+    the tree refreshes its nearest listed ancestor instead.
+    """
+    if not _is_within(str(directory), str(root)):
+        return
+    node = find_node(tree, root, directory)
+    while node is None and directory != root:
+        directory = directory.parent
+        node = find_node(tree, root, directory)
+    if node is None:
+        return
+    with_files = asset_root is not None and _is_within(node.path, str(asset_root))
+    subdirs, node.files = _list_dir(node.path, with_files)
+    existing = {child.name: child for child in node.children}
+    node.children = [existing.get(entry.name) or scan_tree(Path(entry.path), asset_root) for entry in subdirs]
+
+
+def asset_weights(tree: DirNode, root: Path = REPO_ROOT, asset_root: Path = ASSET_ROOT) -> dict:
+    """
+    Summarize file counts and bytes per asset directory (subtree totals) and per file.
+
+    Paths are relative to `root` with forward slashes.
+    """
+    weights: dict = {"dirs": {}, "files": {}}
+    asset_node = find_node(tree, root, asset_root)
+    if asset_node is None:
+        return weights
+    base = asset_root.relative_to(root).as_posix()
+    # Pre-order walk, then accumulate totals bottom-up in reverse order.
+    order: list[tuple[DirNode, str, str | None]] = []
+    stack: list[tuple[DirNode, str, str | None]] = [(asset_node, base, None)]
+    while stack:
+        node, rel, parent_rel = stack.pop()
+        order.append((node, rel, parent_rel))
+        stack.extend((child, f"{rel}/{child.name}", rel) for child in node.children)
+    totals: dict[str, list[int]] = {}
+    for node, rel, _ in order:
+        totals[rel] = [len(node.files), sum(size for _, size in node.files)]
+        for name, size in node.files:
+            weights["files"][f"{rel}/{name}"] = size
+    for _, rel, parent_rel in reversed(order):
+        if parent_rel is not None:
+            totals[parent_rel][0] += totals[rel][0]
+            totals[parent_rel][1] += totals[rel][1]
+    weights["dirs"] = dict(sorted(totals.items()))
+    weights["files"] = dict(sorted(weights["files"].items()))
+    return weights
+
+
+def _human_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _delta(current: int, previous: int | None) -> str:
+    if previous is None:
+        return "new"
+    diff = current - previous
+    if diff == 0:
+        return "—"
+    sign = "+" if diff > 0 else "-"
+    return f"{sign}{_human_bytes(abs(diff))}"
+
+
+def generate_asset_report(weights: dict, previous: dict | None, top_n: int = ASSET_TOP_FILES) -> str:
+    previous = previous or {"dirs": {}, "files": {}}
+    lines = [
+        "# ASSET_WEIGHTS — Shipped Asset Sizes",
+        "",
+        f"_Last generated: {today()}_",
+        "",
+        "Deltas compare against the previous report (`ASSET_WEIGHTS.json`).",
+        "",
+        "## Per Directory",
+        "",
+        "| Directory | Files | Size | Δ |",
+        "| --- | --- | --- | --- |",
+    ]
+    for rel, (count, size) in weights["dirs"].items():
+        before = previous["dirs"].get(rel)
+        lines.append(f"| `{rel}/` | {count} | {_human_bytes(size)} | {_delta(size, before[1] if before else None)} |")
+    removed_dirs = sorted(set(previous["dirs"]) - set(weights["dirs"]))
+    for rel in removed_dirs:
+        lines.append(f"| `{rel}/` | 0 | 0 B | removed (-{_human_bytes(previous['dirs'][rel][1])}) |")
+
+    largest = sorted(weights["files"].items(), key=lambda item: (-item[1], item[0]))[:top_n]
+    lines.extend(
+        [
+            "",
+            f"## Largest Files (top {top_n})",
+            "",
+            "| File | Size | Δ |",
+            "| --- | --- | --- |",
+        ],
+    )
+    for rel, size in largest:
+        lines.append(f"| `{rel}` | {_human_bytes(size)} | {_delta(size, previous['files'].get(rel))} |")
+    lines.extend(["", "> Generated via `agents/scripts/generate_sitemap.py`."])
+    return "\n".join(lines)
+
+
+def load_asset_snapshot(path: Path = ASSET_SNAPSHOT) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def generate_top_level(tree: DirNode | None = None) -> str:
+    tree = tree or scan_tree()
     lines = [
         "# SITEMAP — Source Overview",
         "",
@@ -28,15 +354,9 @@ def generate_top_level() -> str:
         "## Top-Level Directories",
         "",
     ]
-    for entry in sorted(REPO_ROOT.iterdir(), key=lambda p: p.name.lower()):
-        if not entry.is_dir() or should_skip(entry):
-            continue
+    for entry in tree.children:
         lines.append(f"- `{entry.name}/`")
-        subdirs = [
-            child.name + "/"
-            for child in sorted(entry.iterdir(), key=lambda p: p.name.lower())
-            if child.is_dir() and not should_skip(child)
-        ]
+        subdirs = [child.name + "/" for child in entry.children]
         if subdirs:
             preview = ", ".join(subdirs[:TOP_LEVEL_LIMIT])
             if len(subdirs) > TOP_LEVEL_LIMIT:
@@ -51,19 +371,17 @@ def generate_top_level() -> str:
     return "\n".join(lines)
 
 
-def build_tree(prefix: str, path: Path, depth: int, lines: list[str]) -> None:
-    indent = "  " * depth
-    lines.append(f"{indent}{prefix}{path.name}/")
-    children = [
-        child
-        for child in sorted(path.iterdir(), key=lambda p: p.name.lower())
-        if child.is_dir() and not should_skip(child)
-    ]
-    for child in children:
-        build_tree(prefix, child, depth + 1, lines)
+def build_tree(prefix: str, node: DirNode, depth: int, lines: list[str]) -> None:
+    """Append `node` and its descendants as indented lines (depth-first, iterative)."""
+    stack = [(node, depth)]
+    while stack:
+        current, level = stack.pop()
+        lines.append(f"{'  ' * level}{prefix}{current.name}/")
+        stack.extend((child, level + 1) for child in reversed(current.children))
 
 
-def generate_detailed() -> str:
+def generate_detailed(tree: DirNode | None = None) -> str:
+    tree = tree or scan_tree()
     lines = [
         "# SITEMAP_DETAILED — Directory Tree",
         "",
@@ -71,28 +389,114 @@ def generate_detailed() -> str:
         "",
         "```",
     ]
-    for entry in sorted(REPO_ROOT.iterdir(), key=lambda p: p.name.lower()):
-        if not entry.is_dir() or should_skip(entry):
-            continue
+    for entry in tree.children:
         build_tree("", entry, 0, lines)
     lines.append("```")
     lines.append("> Generated via `agents/scripts/generate_sitemap.py`.")
     return "\n".join(lines)
 
 
-def main() -> int:
+def write_outputs(tree: DirNode, top: int = ASSET_TOP_FILES) -> list[Path]:
+    """Write both sitemaps, ASSET_WEIGHTS.md, and its JSON snapshot from `tree`; returns the Markdown paths."""
     ensure_dir(AGENTS_DIR)
     sitemap_path = AGENTS_DIR / "SITEMAP.md"
     detailed_path = AGENTS_DIR / "SITEMAP_DETAILED.md"
+    weights = asset_weights(tree)
+    asset_report = generate_asset_report(weights, load_asset_snapshot(), top)
+
+    write_md(sitemap_path, generate_top_level(tree))
+    write_md(detailed_path, generate_detailed(tree))
+    write_md(ASSET_REPORT, asset_report)
+    ASSET_SNAPSHOT.write_text(json.dumps(weights, indent=2) + "\n", encoding="utf-8")
+    track_path(ASSET_SNAPSHOT)
+    return [sitemap_path, detailed_path, ASSET_REPORT]
+
+
+def _make_synthetic_tree(root: Path, count: int, fanout: int = 8) -> int:
+    """Create roughly `count` nested directories under `root`, breadth-first."""
+    made = 0
+    frontier = [root]
+    while made < count:
+        next_frontier = []
+        for parent in frontier:
+            for idx in range(fanout):
+                if made >= count:
+                    break
+                child = parent / f"d{idx}"
+                child.mkdir()
+                next_frontier.append(child)
+                made += 1
+        frontier = next_frontier
+    return made
 
-    top_level = generate_top_level()
-    detailed = generate_detailed()
 
-    write_md(sitemap_path, top_level)
-    write_md(detailed_path, detailed)
+def run_benchmark(count: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        made = _make_synthetic_tree(root, count)
+        print(f"Sitemap benchmark: {made} directories")
+        started = time.perf_counter()
+        tree = scan_tree(root)
+        walked = time.perf_counter()
+        top_level = generate_top_level(tree)
+        detailed = generate_detailed(tree)
+        rendered = time.perf_counter()
+        print(f"  scandir walk : {walked - started:8.3f}s")
+        print(f"  render both  : {rendered - walked:8.3f}s")
+        print(f"  output lines : {top_level.count(chr(10)) + detailed.count(chr(10))}")
+        cache_path = Path(f"{tmp}-sitemap-cache.json")
+        for label in ("cold", "warm"):
+            started = time.perf_counter()
+            _, relisted, reused = scan_tree_incremental(root, None, cache_path, racy_window_ns=0)
+            print(f"  incremental ({label}): {time.perf_counter() - started:8.3f}s  relisted={relisted} reused={reused}")
+        cache_path.unlink(missing_ok=True)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate SITEMAP.md and SITEMAP_DETAILED.md.")
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        nargs="?",
+        const=200_000,
+        metavar="DIRS",
+        help="Time the walk on a synthetic tree (default 200000 directories) and exit",
+    )
+    parser.add_argument(
+        "--git",
+        action="store_true",
+        help="Build the tree from `git ls-files` (tracked files only, honors .gitignore)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=ASSET_TOP_FILES,
+        help="Number of largest asset files listed in ASSET_WEIGHTS.md",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Reuse cached listings for directories whose mtime is unchanged ({TREE_CACHE.relative_to(AGENTS_DIR)})",
+    )
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        return run_benchmark(args.benchmark)
+
+    tree = None
+    if args.git:
+        try:
+            tree = scan_git_tree()
+        except (OSError, subprocess.CalledProcessError) as exc:
+            print(f"git ls-files unavailable ({exc}); walking the filesystem instead.")
+    if tree is None and args.incremental:
+        tree, relisted, reused = scan_tree_incremental()
+        print(f"Re-listed {relisted} director(ies), reused {reused} from cache.")
+    if tree is None:
+        tree = scan_tree()
 
-    print(f"Updated {sitemap_path.relative_to(REPO_ROOT)}")
-    print(f"Updated {detailed_path.relative_to(REPO_ROOT)}")
+    for path in write_outputs(tree, args.top):
+        print(f"Updated {path.relative_to(REPO_ROOT)}")
     return 0
 
 
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Append-only handoff store behind HANDOFFS.md.
+
+Layout under `agents/handoffs/`:
+
+- `segments/segment-NNNNN-YYYYMMDD.md` — entries appended oldest → newest; the
+  highest-numbered segment is active, the rest are dated archives. A segment
+  rotates once it reaches `SEGMENT_MAX_BYTES`.
+- `index.jsonl` — one line per entry: `[segment, offset, length, date, title, pr]`.
+- `automation.log` — Automation Runs bullets, oldest → newest.
+- `dedupe.keys` — dedupe keys for every entry: `pr:` (or `title:` when it has no PR)
+  plus `hash:`, one per line, loaded into a set so duplicate checks are a single lookup.
+- `preamble.md` / `trailer.md` — the static text above and below the entries.
+
+Appends open the active segment and the index in append mode under a lock,
+so their cost does not depend on history size. `HANDOFFS.md` is a head view
+rebuilt from the newest `HEAD_ENTRIES` entries via a tail read of the index.
+
+Usage:
+    python handoff_log.py rebuild [--entries N]
+    python handoff_log.py show INDEX
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Iterator, List, Optional, Set
+
+from utils import AGENTS_DIR, ensure_dir, file_lock, today, track_path, write_text_atomic
+
+HANDOFF_FILE = AGENTS_DIR / "HANDOFFS.md"
+HANDOFF_DIR = AGENTS_DIR / "handoffs"
+SEGMENTS_DIR = HANDOFF_DIR / "segments"
+INDEX_FILE = HANDOFF_DIR / "index.jsonl"
+AUTOMATION_LOG = HANDOFF_DIR / "automation.log"
+PREAMBLE_FILE = HANDOFF_DIR / "preamble.md"
+TRAILER_FILE = HANDOFF_DIR / "trailer.md"
+DEDUPE_FILE = HANDOFF_DIR / "dedupe.keys"
+LOCK_FILE = HANDOFF_DIR / ".lock"
+
+SEGMENT_MAX_BYTES = 64 * 1024
+HEAD_ENTRIES = 10
+HEAD_AUTOMATION = 20
+DEFAULT_PREAMBLE = "# Handoff Log\n\n---\n\n"
+AUTOMATION_MARKER = "## Automation Runs"
+ENTRY_HEADER = re.compile(r"^## Entry: (\S+) — \"(.*)\"", re.MULTILINE)
+TEMPLATE_DATE = "YYYY-MM-DD"
+
+
+def tail_lines(path: Path, count: int, block_size: int = 8192) -> List[str]:
+    """Return the last `count` lines of `path` by reading backwards from the end."""
+    if count <= 0 or not path.exists():
+        return []
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            handle.seek(position)
+            data = handle.read(step) + data
+    lines = data.decode("utf-8").splitlines()
+    return [line for line in lines[-count:] if line]
+
+
+def _segment_name(seq: int) -> str:
+    return f"segment-{seq:05d}-{today().replace('-', '')}.md"
+
+
+def _segment_seq(name: str) -> int:
+    return int(name.split("-")[1])
+
+
+def _last_record() -> Optional[list]:
+    lines = tail_lines(INDEX_FILE, 1)
+    return json.loads(lines[0]) if lines else None
+
+
+def normalize_title(title: str) -> str:
+    """Case-, width- and whitespace-insensitive title key."""
+    text = unicodedata.normalize("NFKC", title).casefold()
+    return " ".join(text.strip(" \t\"'`“”‘’").split())
+
+
+def content_hash(text: str) -> str:
+    """Hash of an entry without its dated header line, so a re-run on another day still matches."""
+    body = text.split("\n", 1)[1] if text.startswith("## Entry:") else text
+    return hashlib.sha1(" ".join(body.split()).encode("utf-8")).hexdigest()
+
+
+def entry_keys(title: str, pr: Optional[int] = None, text: Optional[str] = None) -> List[str]:
+    """
+    Dedupe keys for an entry: its PR number when it has one, else its normalized title,
+    plus the content hash. Distinct PRs may share a title, so titles only identify PR-less entries.
+    """
+    keys = [f"pr:{pr}"] if pr else [f"title:{normalize_title(title)}"]
+    if text is not None:
+        keys.append(f"hash:{content_hash(text)}")
+    return keys
+
+
+def _ensure_dedupe() -> None:
+    """Rebuild `dedupe.keys` from the index when it is missing. Caller holds the lock."""
+    if DEDUPE_FILE.exists():
+        return
+    ensure_dir(HANDOFF_DIR)
+    lines = []
+    for record in iter_index():
+        lines.extend(entry_keys(record[4], record[5], read_entry(record)))
+    write_text_atomic(DEDUPE_FILE, "".join(f"{key}\n" for key in lines))
+    track_path(DEDUPE_FILE)
+
+
+def load_dedupe() -> Set[str]:
+    """Every dedupe key recorded so far."""
+    ensure_store()
+    if not DEDUPE_FILE.exists():
+        with file_lock(LOCK_FILE):
+            _ensure_dedupe()
+    with DEDUPE_FILE.open(encoding="utf-8") as handle:
+        return {line.rstrip("\n") for line in handle if line.strip()}
+
+
+def is_duplicate(
+    title: str,
+    pr: Optional[int] = None,
+    text: Optional[str] = None,
+    keys: Optional[Set[str]] = None,
+) -> bool:
+    """True when the PR number (or, for PR-less entries, the title) or the content has been logged."""
+    known = keys if keys is not None else load_dedupe()
+    return any(key in known for key in entry_keys(title, pr, text))
+
+
+def _write_entries(items: List[tuple]) -> List[list]:
+    """
+    Append `(text, date, title, pr)` entries in order. Caller holds the lock.
+
+    Payloads are grouped per segment (rotating when full) so each segment, the
+    index and the dedupe keys each receive a single append.
+    """
+    ensure_dir(SEGMENTS_DIR)
+    _ensure_dedupe()
+    last = _last_record()
+    segment = last[0] if last else _segment_name(1)
+    segment_path = SEGMENTS_DIR / segment
+    size = segment_path.stat().st_size if segment_path.exists() else 0
+
+    chunks: dict[str, list[bytes]] = {}
+    records: List[list] = []
+    keys: List[str] = []
+    for text, date, title, pr in items:
+        payload = text.encode("utf-8")
+        if size and size + len(payload) > SEGMENT_MAX_BYTES:
+            segment = _segment_name(_segment_seq(segment) + 1)
+            size = 0
+        chunks.setdefault(segment, []).append(payload + b"\n")
+        records.append([segment, size, len(payload), date, title, pr])
+        keys.extend(entry_keys(title, pr, text))
+        size += len(payload) + 1
+
+    for name, parts in chunks.items():
+        with (SEGMENTS_DIR / name).open("ab") as handle:
+            handle.write(b"".join(parts))
+        track_path(SEGMENTS_DIR / name)
+    with INDEX_FILE.open("a", encoding="utf-8") as handle:
+        handle.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+    with DEDUPE_FILE.open("a", encoding="utf-8") as handle:
+        handle.write("".join(f"{key}\n" for key in keys))
+    track_path(INDEX_FILE)
+    track_path(DEDUPE_FILE)
+    return records
+
+
+def read_entry(record: list) -> str:
+    segment, offset, length = record[:3]
+    with (SEGMENTS_DIR / segment).open("rb") as handle:
+        handle.seek(offset)
+        return handle.read(length).decode("utf-8")
+
+
+def iter_index() -> Iterator[list]:
+    """Every index record, oldest first."""
+    if not INDEX_FILE.exists():
+        return
+    with INDEX_FILE.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _entry_metadata(text: str) -> tuple[str, str, Optional[int]]:
+    header = ENTRY_HEADER.search(text)
+    date, title = (header.group(1), header.group(2)) if header else (today(), "")
+    pr = re.search(r"Source PR: #(\d+)", text)
+    return date, title, int(pr.group(1)) if pr else None
+
+
+def split_handoff_markdown(content: str) -> tuple[str, List[str], List[str], str]:
+    """Split a monolithic HANDOFFS.md into (preamble, automation bullets, entries newest-first, trailer)."""
+    auto_pos = content.find(AUTOMATION_MARKER)
+    headers = list(ENTRY_HEADER.finditer(content))
+    first_entry = headers[0].start() if headers else len(content)
+    trailer_pos = next((h.start() for h in headers if h.group(1) == TEMPLATE_DATE), len(content))
+
+    if auto_pos >= 0 and auto_pos < first_entry:
+        preamble = content[:auto_pos]
+        block = content[auto_pos + len(AUTOMATION_MARKER):first_entry]
+        bullets = [line[2:] for line in block.splitlines() if line.startswith("- ")]
+    else:
+        preamble = content[:first_entry]
+        bullets = []
+
+    entries = []
+    starts = [h.start() for h in headers if h.start() < trailer_pos]
+    for start, end in zip(starts, starts[1:] + [trailer_pos]):
+        entries.append(content[start:end].rstrip() + "\n")
+    return preamble, bullets, entries, content[trailer_pos:]
+
+
+def ensure_store() -> None:
+    """Seed the store from the current HANDOFFS.md the first time it is used."""
+    if INDEX_FILE.exists():
+        return
+    with file_lock(LOCK_FILE):
+        if INDEX_FILE.exists():
+            return
+        content = HANDOFF_FILE.read_text(encoding="utf-8") if HANDOFF_FILE.exists() else DEFAULT_PREAMBLE
+        preamble, bullets, entries, trailer = split_handoff_markdown(content)
+        ensure_dir(HANDOFF_DIR)
+        PREAMBLE_FILE.write_text(preamble, encoding="utf-8")
+        TRAILER_FILE.write_text(trailer, encoding="utf-8")
+        AUTOMATION_LOG.write_text("".join(f"{line}\n" for line in reversed(bullets)), encoding="utf-8")
+        INDEX_FILE.touch()
+        _write_entries([(entry, *_entry_metadata(entry)) for entry in reversed(entries)])
+        for path in (PREAMBLE_FILE, TRAILER_FILE, AUTOMATION_LOG, INDEX_FILE):
+            track_path(path)
+
+
+def append_entry(text: str, title: str, pr: Optional[int] = None, date: Optional[str] = None) -> list:
+    """Append a rendered entry and return its index record."""
+    ensure_store()
+    with file_lock(LOCK_FILE):
+        return _write_entries([(text, date or today(), title, pr)])[0]
+
+
+def append_entries(items: List[tuple]) -> List[list]:
+    """Append `(text, date, title, pr)` entries, oldest first, in one locked write."""
+    ensure_store()
+    with file_lock(LOCK_FILE):
+        return _write_entries(items)
+
+
+def append_automation(line: str) -> None:
+    ensure_store()
+    with file_lock(LOCK_FILE):
+        with AUTOMATION_LOG.open("a", encoding="utf-8") as handle:
+            handle.write(f"{line}\n")
+    track_path(AUTOMATION_LOG)
+
+
+def render_head(entries: int = HEAD_ENTRIES, automation: int = HEAD_AUTOMATION) -> str:
+    """Human-readable view: preamble, newest automation bullets, newest entries, trailer."""
+    preamble = PREAMBLE_FILE.read_text(encoding="utf-8") if PREAMBLE_FILE.exists() else DEFAULT_PREAMBLE
+    trailer = TRAILER_FILE.read_text(encoding="utf-8") if TRAILER_FILE.exists() else ""
+    bullets = list(reversed(tail_lines(AUTOMATION_LOG, automation)))
+    records = list(reversed([json.loads(line) for line in tail_lines(INDEX_FILE, entries + 1)]))
+
+    parts = [preamble]
+    if bullets:
+        parts.append(f"{AUTOMATION_MARKER}\n\n" + "".join(f"- {line}\n" for line in bullets) + "\n---\n\n")
+    parts.extend(read_entry(record) + "\n" for record in records[:entries])
+    if len(records) > entries:
+        parts.append(
+            f"_Older entries are archived in `{SEGMENTS_DIR.relative_to(AGENTS_DIR)}/` "
+            f"(index: `{INDEX_FILE.relative_to(AGENTS_DIR)}`)._\n\n---\n\n"
+        )
+    parts.append(trailer)
+    return "".join(parts)
+
+
+def rebuild_head(entries: int = HEAD_ENTRIES) -> None:
+    ensure_store()
+    with file_lock(LOCK_FILE):
+        write_text_atomic(HANDOFF_FILE, render_head(entries))
+    track_path(HANDOFF_FILE)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain the append-only handoff store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Regenerate HANDOFFS.md from the newest entries")
+    rebuild.add_argument("--entries", type=int, default=HEAD_ENTRIES, help="Entries to show in the head view")
+    show = sub.add_parser("show", help="Print one entry by index position (negative counts from newest)")
+    show.add_argument("position", type=int)
+    args = parser.parse_args(argv)
+
+    ensure_store()
+    if args.command == "rebuild":
+        rebuild_head(args.entries)
+        print(f"Rebuilt {HANDOFF_FILE.relative_to(AGENTS_DIR)}")
+        return 0
+    records = list(iter_index())
+    try:
+        record = records[args.position]
+    except IndexError:
+        print(f"No entry at position {args.position} ({len(records)} indexed).")
+        return 1
+    print(read_entry(record), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
 #!/usr/bin/env python3
-"""Append handoff entries after labeled PR merges."""
+"""Append handoff entries after labeled PR merges.
+
+`--backfill PATH` replays a directory of event payloads (`*.json`/`*.jsonl`)
+or a single JSONL file: merged PRs carrying the `handoff` label become
+entries, ordered by merge time, deduped, and appended in one write.
+"""
 
 from __future__ import annotations
 
@@ -8,42 +13,16 @@ import json
 import os
 import sys
 from pathlib import Path
+from typing import Iterator
 
-from utils import AGENTS_DIR, today
+import handoff_log
+from utils import today
 
-HANDOFF_FILE = AGENTS_DIR / "HANDOFFS.md"
 
 def append_automation_line(line: str) -> None:
     """Append a single bullet line under the Automation Runs section."""
-    content = HANDOFF_FILE.read_text(encoding="utf-8")
-    marker = "## Automation Runs"
-    bullet = f"- {line}"
-
-    if marker not in content:
-        insertion = f"{marker}\n\n{bullet}\n\n---\n"
-        if "\n---\n" in content:
-            content = content.replace("\n---\n", f"\n\n{insertion}\n---\n", 1)
-        else:
-            content = f"{content.rstrip()}\n\n{insertion}"
-        HANDOFF_FILE.write_text(content, encoding="utf-8")
-        return
-
-    lines = content.splitlines()
-    inserted = False
-    for idx, line_text in enumerate(lines):
-        if line_text.strip() == marker:
-            insert_at = idx + 1
-            while insert_at < len(lines) and not lines[insert_at].strip():
-                insert_at += 1
-            lines.insert(insert_at, bullet)
-            inserted = True
-            break
-    if not inserted:
-        lines.append(marker)
-        lines.append("")
-        lines.append(bullet)
-    new_content = "\n".join(lines).rstrip() + "\n"
-    HANDOFF_FILE.write_text(new_content, encoding="utf-8")
+    handoff_log.append_automation(line)
+    handoff_log.rebuild_head()
 
 
 def load_event() -> dict:
@@ -84,8 +63,9 @@ def build_entry(
     notes: list[str],
     pr_number: int | None,
     branch: str | None,
+    entry_date: str | None = None,
 ) -> str:
-    today_str = today()
+    today_str = entry_date or today()
     header = f"## Entry: {today_str} — \"{title}\" (Agent codename: `{codename}`)\n"
     summary_block = "\n".join([header, "\n**Summary**\n"] + [f"* {line}" for line in summary_lines])
 
@@ -113,17 +93,93 @@ def build_entry(
     return entry.strip() + "\n"
 
 
-def insert_entry_into_file(content: str, entry: str) -> str:
-    marker = "\n---\n"
-    if marker not in content:
-        return content + "\n" + entry
-    head, tail = content.split(marker, 1)
-    return f"{head}{marker}\n\n{entry}{tail}"
+def already_logged(title: str, pr_number: int | None = None, entry: str | None = None) -> bool:
+    """Check the persisted dedupe keys (normalized title, PR number, content hash)."""
+    return handoff_log.is_duplicate(title, pr_number, entry)
+
+
+def entry_from_pr(
+    pr: dict,
+    title: str | None = None,
+    codename: str | None = None,
+    summary: list[str] | None = None,
+    next_steps: list[str] | None = None,
+    notes: list[str] | None = None,
+    entry_date: str | None = None,
+) -> tuple[str, str]:
+    """Build `(title, entry)` for a pull_request payload, with optional overrides."""
+    title = title or pr.get("title") or "Handoff Update"
+    codename = codename or (pr.get("merged_by") or {}).get("login") or os.getenv("GITHUB_ACTOR", "unknown")
+    summary_lines = summary or strip_bullets(pr.get("body") or "")
+    if not summary_lines:
+        summary_lines = [f"Merged PR #{pr.get('number', 'N/A')}"]
+    entry = build_entry(
+        title=title,
+        codename=codename,
+        summary_lines=summary_lines,
+        next_steps=list(next_steps or []),
+        notes=list(notes or []),
+        pr_number=pr.get("number"),
+        branch=(pr.get("base") or {}).get("ref"),
+        entry_date=entry_date,
+    )
+    return title, entry
 
 
-def already_logged(content: str, title: str) -> bool:
-    marker = f"\"{title}\""
-    return marker in content
+def is_handoff_merge(event: dict) -> bool:
+    pr = event.get("pull_request") or {}
+    return event.get("action") == "closed" and bool(pr.get("merged")) and has_handoff_label(pr.get("labels", []))
+
+
+def iter_events(source: Path) -> Iterator[dict]:
+    """Stream events from a JSONL file or a directory of JSON/JSONL payloads (in name order)."""
+    if source.is_dir():
+        files = sorted(path for path in source.iterdir() if path.suffix in {".json", ".jsonl"})
+    else:
+        files = [source]
+    for path in files:
+        if path.suffix == ".jsonl":
+            with path.open(encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            yield json.loads(path.read_text(encoding="utf-8"))
+
+
+BACKFILL_FIELDS = ("title", "body", "number", "merged_at", "merged_by", "base")
+
+
+def backfill(source: Path) -> int:
+    """Append entries for every labeled merge in `source`, oldest merge first, in one write."""
+    matched: list[dict] = []
+    scanned = 0
+    for event in iter_events(source):
+        scanned += 1
+        if is_handoff_merge(event):
+            pr = event["pull_request"]
+            matched.append({field: pr.get(field) for field in BACKFILL_FIELDS})
+    matched.sort(key=lambda pr: (pr.get("merged_at") or "", pr.get("number") or 0))
+
+    known = handoff_log.load_dedupe()
+    items = []
+    for pr in matched:
+        entry_date = (pr.get("merged_at") or "")[:10] or today()
+        title, entry = entry_from_pr(pr, entry_date=entry_date)
+        keys = handoff_log.entry_keys(title, pr.get("number"), entry)
+        if any(key in known for key in keys):
+            continue
+        known.update(keys)
+        items.append((entry, entry_date, title, pr.get("number")))
+
+    if items:
+        handoff_log.append_entries(items)
+        handoff_log.rebuild_head()
+    print(
+        f"Scanned {scanned} event(s): {len(matched)} labeled merge(s), "
+        f"{len(items)} appended, {len(matched) - len(items)} duplicate(s) skipped."
+    )
+    return 0
 
 
 def main() -> int:
@@ -135,8 +191,20 @@ def main() -> int:
     parser.add_argument("--note", dest="notes", action="append", help="Note bullet (repeatable)")
     parser.add_argument("--force", action="store_true", help="Force entry even without event data")
     parser.add_argument("--append", dest="append_line", help="Append a single Automation Runs bullet")
+    parser.add_argument(
+        "--backfill",
+        type=Path,
+        metavar="PATH",
+        help="Replay a directory or JSONL file of pull_request events in one batch",
+    )
     args = parser.parse_args()
 
+    if args.backfill:
+        if not args.backfill.exists():
+            print(f"Backfill source not found: {args.backfill}")
+            return 1
+        return backfill(args.backfill)
+
     if args.append_line:
         append_automation_line(args.append_line)
         print(f"Appended automation note: {args.append_line}")
@@ -144,11 +212,9 @@ def main() -> int:
 
     event = load_event()
     pr = event.get("pull_request") or {}
-    action = event.get("action")
-    merged = pr.get("merged")
 
     if event:
-        if not (action == "closed" and merged):
+        if not (event.get("action") == "closed" and pr.get("merged")):
             print("No merged pull_request event; skipping handoff entry.")
             return 0
         if not has_handoff_label(pr.get("labels", [])):
@@ -159,30 +225,20 @@ def main() -> int:
         print("No event context and no manual data provided; nothing to do.")
         return 0
 
-    title = args.title or pr.get("title") or "Handoff Update"
-    codename = args.codename or (pr.get("merged_by") or {}).get("login") or os.getenv("GITHUB_ACTOR", "unknown")
-    summary_lines = args.summary or strip_bullets(pr.get("body") or "")
-    if not summary_lines:
-        summary_lines = [f"Merged PR #{pr.get('number', 'N/A')}"]
-    next_steps = args.next_steps or []
-    notes = args.notes or []
-
-    content = HANDOFF_FILE.read_text(encoding="utf-8")
-    if already_logged(content, title) and not args.force:
+    title, entry = entry_from_pr(
+        pr,
+        title=args.title,
+        codename=args.codename,
+        summary=args.summary,
+        next_steps=args.next_steps,
+        notes=args.notes,
+    )
+    if already_logged(title, pr.get("number"), entry) and not args.force:
         print("Entry already exists; skipping to avoid duplicates.")
         return 0
 
-    entry = build_entry(
-        title=title,
-        codename=codename,
-        summary_lines=summary_lines,
-        next_steps=next_steps,
-        notes=notes,
-        pr_number=pr.get("number"),
-        branch=(pr.get("base") or {}).get("ref"),
-    )
-    updated = insert_entry_into_file(content, entry)
-    HANDOFF_FILE.write_text(updated, encoding="utf-8")
+    handoff_log.append_entry(entry, title, pr.get("number"))
+    handoff_log.rebuild_head()
     print(f"Appended handoff entry for {title}")
     return 0
 
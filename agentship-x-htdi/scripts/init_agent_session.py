@@ -4,13 +4,12 @@
 from __future__ import annotations
 
 import argparse
-from pathlib import Path
 import sys
 
+import session_store
 from utils import (
     AGENTS_DIR,
     TEMPLATES_DIR,
-    ensure_dir,
     now_ts,
     today,
 )
@@ -46,7 +45,6 @@ def main() -> int:
         print(f"Project folder not found: {project_dir}")
         return 1
 
-    sessions_dir = ensure_dir(project_dir / "sessions")
     if not SESSION_TEMPLATE.exists():
         print(f"Missing session template: {SESSION_TEMPLATE}")
         return 1
@@ -54,16 +52,9 @@ def main() -> int:
     template = SESSION_TEMPLATE.read_text(encoding="utf-8")
     content = populate_template(template, args.title, args.tasks or [])
 
-    filename = f"{now_ts()}-session.md"
-    target = sessions_dir / filename
-    counter = 1
-    while target.exists():
-        target = sessions_dir / f"{filename}-{counter}"
-        counter += 1
-
-    target.write_text(content, encoding="utf-8")
+    session_id, target = session_store.create_session(project_dir, content, args.tasks or [], label="session")
     rel_path = target.relative_to(AGENTS_DIR.parent)
-    print(f"Session log created at {rel_path}")
+    print(f"Session log {session_id} created at {rel_path}")
     return 0
 
 
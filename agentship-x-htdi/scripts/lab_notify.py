@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Queued, batched notifications to the HTDI lab API.
+
+`LabNotifier.notify` only enqueues; a background thread drains the queue in
+batches over one pooled `requests.Session` and retries failed batches with
+backoff. `close()` (also registered with `atexit`, which an explicit close cancels)
+flushes what is left, bounded by a timeout so a slow or absent lab API never
+stalls a sync.
+
+The lab exposes `/api/run-command`, so a batch is a single `echo` command
+whose args are the queued messages.
+"""
+
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RUN_COMMAND_PATH = "/api/run-command"
+_STOP = object()
+
+
+class LabNotifier:
+    """Background batch sender for lab notifications."""
+
+    def __init__(
+        self,
+        api_url: str,
+        batch_size: int = 50,
+        flush_interval: float = 0.2,
+        max_retries: int = 3,
+        backoff: float = 0.25,
+        timeout: float = 5.0,
+        pool_size: int = 4,
+    ) -> None:
+        self.url = f"{api_url.rstrip('/')}{RUN_COMMAND_PATH}"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats: Dict[str, int] = {"queued": 0, "sent": 0, "failed": 0, "batches": 0, "retries": 0}
+        self.last_error: Optional[str] = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._queue: "queue.Queue[object]" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="lab-notifier", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def notify(self, message: str) -> None:
+        """Queue a message; never blocks on the network."""
+        if self._closed:
+            return
+        self.stats["queued"] += 1
+        self._queue.put(message)
+
+    def _next_batch(self) -> tuple[List[str], bool]:
+        """Block for the first message, then gather more until the batch fills or the interval passes."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(0.0, remaining)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _send(self, batch: List[str]) -> None:
+        payload = {"command": "echo", "args": batch}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.ok:
+                    self.stats["sent"] += len(batch)
+                    self.stats["batches"] += 1
+                    return
+                self.last_error = f"HTTP {response.status_code}"
+                if response.status_code < 500 and response.status_code != 429:
+                    break
+            except requests.RequestException as exc:
+                self.last_error = str(exc)
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                # Once closing, retry immediately so the exit flush stays bounded.
+                if not self._closed:
+                    time.sleep(self.backoff * (2 ** attempt))
+        self.stats["failed"] += len(batch)
+
+    def _run(self) -> None:
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._send(batch)
+            if stop:
+                return
+
+    def close(self, timeout: float = 5.0) -> bool:
+        """
+        Flush queued messages and stop the worker; returns False if the timeout hit first.
+        Only the first call waits: later calls (including the atexit hook) return at once.
+        """
+        if self._closed:
+            return not self._worker.is_alive()
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+        self.session.close()
+        return not self._worker.is_alive()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark lab notifications against a local stand-in lab API.
+
+Posts one `Sync completed` message per synthetic house twice: once as a
+one-off `requests.post` each (the old path), then through `LabNotifier`.
+Development aid only; `sync_with_lab.py` does not import it.
+
+    python lab_notify_bench.py 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import requests
+
+from lab_notify import RUN_COMMAND_PATH, LabNotifier
+from sync_with_lab import notify_lab_api
+
+
+class _StandInLab(BaseHTTPRequestHandler):
+    """Minimal /api/run-command endpoint that counts echoed messages"""
+
+    received = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        args = json.loads(body or b"{}").get("args", [])
+        with _StandInLab.lock:
+            _StandInLab.received += len(args)
+        payload = b'{"ok":true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_notify_benchmark(houses: int) -> int:
+    """Compare one-off posts with the batched notifier against a local stand-in lab API"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInLab)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    configs = [
+        {"lab": {"enabled": True, "apiUrl": api_url}, "house": {"name": f"house-{idx}"}}
+        for idx in range(houses)
+    ]
+    print(f"📊 Notification benchmark: {houses} house(s) against {api_url}")
+
+    try:
+        _StandInLab.received = 0
+        started = time.perf_counter()
+        for config in configs:
+            requests.post(
+                f"{api_url}{RUN_COMMAND_PATH}",
+                json={"command": "echo", "args": [f"Sync completed for {config['house']['name']}: bench"]},
+                timeout=5,
+            )
+        elapsed = time.perf_counter() - started
+        print(f"  one-off posts: {elapsed:7.3f}s  {houses / elapsed:9.0f} msg/s  received={_StandInLab.received}")
+
+        _StandInLab.received = 0
+        started = time.perf_counter()
+        notifier = LabNotifier(api_url)
+        for config in configs:
+            notify_lab_api(config, "bench", notifier)
+        enqueued = time.perf_counter() - started
+        notifier.close(timeout=30.0)
+        elapsed = time.perf_counter() - started
+        print(
+            f"  batched:       {elapsed:7.3f}s  {houses / elapsed:9.0f} msg/s  received={_StandInLab.received}"
+            f"  batches={notifier.stats['batches']}  enqueue={enqueued * 1000:.1f} ms"
+        )
+    finally:
+        server.shutdown()
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark lab notifications against a local stand-in API.")
+    parser.add_argument("houses", type=int, nargs="?", default=1000, help="Synthetic houses to notify for (default 1000)")
+    args = parser.parse_args(argv)
+    return run_notify_benchmark(args.houses)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
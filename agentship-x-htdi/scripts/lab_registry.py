@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Transactional updates to the shared lab registry.
+
+Several houses write the same registry, so every change goes through
+`update_document`: read, apply a mutation, then take an flock on
+`<file>.lock`, confirm the document `version` is still the one that was
+read, and write via temp file + rename with the version bumped. A version
+mismatch means another house won the race; the mutation is re-applied to
+the fresh document. The final attempt runs entirely under the lock so an
+update always lands.
+
+Two layouts are supported:
+
+- legacy: one `agents.registry.json` holding `{"houses": [...]}`
+- sharded (`"registryLayout": "sharded"` in the lab config): a sibling
+  `agents.registry.d/` with one compact `houses/<id>.json` per house plus a
+  small `index.json` of house summaries. A house sync touches only its own
+  shard and its index line; `export` rebuilds the legacy file on demand.
+
+Every agent change is also published to a change feed next to the registry
+(`agents.registry.feed/feed.jsonl`): one line per change carrying a global,
+monotonically increasing `rev`, plus `heads.json` with the latest revision
+overall and per house. A house whose head is not past its cursor has nothing
+to pull; otherwise it reads with `read_feed(since, offset)`, which seeks
+straight to its last position, so a pull reads only new changes.
+`edit` plays the lab's part for local testing.
+
+Usage:
+    python lab_registry.py migrate REGISTRY
+    python lab_registry.py export REGISTRY [--output PATH]
+    python lab_registry.py edit REGISTRY HOUSE ALIAS field=value ... [--sharded]
+    python lab_registry.py bench WRITERS [--updates N] [--sharded]
+    python lab_registry.py bench-feed AGENTS [--changes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import ensure_dir, file_lock
+
+DEFAULT_RETRIES = 8
+SHARD_META = ("version", "generatedAt")
+# Mutations return True when they changed the document.
+Mutation = Callable[[Dict], bool]
+
+
+def lock_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.lock")
+
+
+def _read_json(path: Path, default: Callable[[], Dict]) -> Dict:
+    if not path.exists():
+        return default()
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data: Dict, indent: Optional[int]) -> None:
+    ensure_dir(path.parent)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        if indent is None:
+            json.dump(data, f, separators=(",", ":"))
+        else:
+            json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def load_registry(registry_path: Path) -> Dict:
+    return _read_json(registry_path, lambda: {"houses": []})
+
+
+def write_registry(registry: Dict, registry_path: Path) -> None:
+    """Stamp generatedAt and write atomically (temp file + rename)."""
+    registry["generatedAt"] = datetime.utcnow().isoformat() + "Z"
+    _write_json(registry_path, registry, indent=2)
+
+
+def update_document(
+    path: Path,
+    mutate: Mutation,
+    default: Callable[[], Dict],
+    indent: Optional[int] = 2,
+    retries: int = DEFAULT_RETRIES,
+    stats: Dict[str, int] | None = None,
+) -> Tuple[Dict, bool]:
+    """Apply `mutate` to the JSON document at `path` with optimistic concurrency; returns (doc, changed)."""
+
+    def commit(doc: Dict, version: int) -> None:
+        doc["version"] = version + 1
+        doc["generatedAt"] = datetime.utcnow().isoformat() + "Z"
+        _write_json(path, doc, indent)
+
+    ensure_dir(path.parent)
+    for attempt in range(retries):
+        doc = _read_json(path, default)
+        version = doc.get("version", 0)
+        if not mutate(doc):
+            return doc, False
+        with file_lock(lock_path(path)):
+            if _read_json(path, default).get("version", 0) == version:
+                commit(doc, version)
+                return doc, True
+        if stats is not None:
+            stats["conflicts"] = stats.get("conflicts", 0) + 1
+        time.sleep(0.001 * (attempt + 1))
+
+    # Out of optimistic attempts: do the whole read-modify-write under the lock.
+    with file_lock(lock_path(path)):
+        doc = _read_json(path, default)
+        if not mutate(doc):
+            return doc, False
+        commit(doc, doc.get("version", 0))
+        return doc, True
+
+
+def update_registry(
+    registry_path: Path,
+    mutate: Mutation,
+    retries: int = DEFAULT_RETRIES,
+    stats: Dict[str, int] | None = None,
+) -> Tuple[Dict, bool]:
+    """Transactional update of a legacy single-file registry."""
+    return update_document(registry_path, mutate, lambda: {"houses": []}, 2, retries, stats)
+
+
+def find_house(registry: Dict, house_id: str) -> Dict | None:
+    for house in registry.get("houses", []):
+        if house["id"] == house_id:
+            return house
+    return None
+
+
+# --- Sharded layout -------------------------------------------------------
+
+
+def shard_root(registry_path: Path) -> Path:
+    return registry_path.with_name(f"{registry_path.stem}.d")
+
+
+def index_path(registry_path: Path) -> Path:
+    return shard_root(registry_path) / "index.json"
+
+
+def house_path(registry_path: Path, house_id: str) -> Path:
+    return shard_root(registry_path) / "houses" / f"{house_id}.json"
+
+
+def load_index(registry_path: Path) -> Dict:
+    return _read_json(index_path(registry_path), lambda: {"houses": {}})
+
+
+def load_house(registry_path: Path, house_id: str) -> Dict | None:
+    path = house_path(registry_path, house_id)
+    return _read_json(path, dict) if path.exists() else None
+
+
+def _house_summary(house: Dict) -> Dict:
+    return {
+        "name": house.get("name"),
+        "type": house.get("type"),
+        "agents": len(house.get("agents", [])),
+        "version": house.get("version", 0),
+    }
+
+
+def _index_house(registry_path: Path, house_id: str, house: Dict, stats: Dict[str, int] | None = None) -> None:
+    summary = _house_summary(house)
+
+    def apply(index: Dict) -> bool:
+        houses = index.setdefault("houses", {})
+        current = houses.get(house_id)
+        if current is not None and current.get("version", 0) >= summary["version"]:
+            return False
+        houses[house_id] = summary
+        return True
+
+    # The index is tiny and every house touches it, so update it under the lock directly.
+    update_document(index_path(registry_path), apply, lambda: {"houses": {}}, 2, retries=0, stats=stats)
+
+
+def update_house(
+    registry_path: Path,
+    house_id: str,
+    mutate: Mutation,
+    stats: Dict[str, int] | None = None,
+) -> Tuple[Dict, bool]:
+    """Transactional update of one house shard; `mutate` receives the house dict ({} when new)."""
+    house, changed = update_document(house_path(registry_path, house_id), mutate, dict, None, stats=stats)
+    if changed:
+        _index_house(registry_path, house_id, house, stats)
+    return house, changed
+
+
+def migrate_to_shards(registry_path: Path) -> int:
+    """Split a legacy registry into per-house shards plus an index."""
+    houses = load_registry(registry_path).get("houses", [])
+    for house in houses:
+
+        def replace(doc: Dict, house: Dict = house) -> bool:
+            doc.clear()
+            doc.update(house)
+            return True
+
+        update_house(registry_path, house["id"], replace)
+    return len(houses)
+
+
+def export_legacy(registry_path: Path, output: Optional[Path] = None) -> int:
+    """Rebuild the single-file `{"houses": [...]}` registry from the shards."""
+    houses: List[Dict] = []
+    for house_id in load_index(registry_path).get("houses", {}):
+        house = load_house(registry_path, house_id)
+        if house is not None:
+            houses.append({key: value for key, value in house.items() if key not in SHARD_META})
+    target = output or registry_path
+    with file_lock(lock_path(target)):
+        previous = load_registry(target) if target.exists() else {}
+        registry = {"houses": houses, "version": previous.get("version", 0) + 1}
+        write_registry(registry, target)
+    return len(houses)
+
+
+# --- Change feed --------------------------------------------------------------
+
+
+def feed_root(registry_path: Path) -> Path:
+    return registry_path.with_name(f"{registry_path.stem}.feed")
+
+
+def feed_path(registry_path: Path) -> Path:
+    return feed_root(registry_path) / "feed.jsonl"
+
+
+def heads_path(registry_path: Path) -> Path:
+    return feed_root(registry_path) / "heads.json"
+
+
+def load_heads(registry_path: Path) -> Dict:
+    return _read_json(heads_path(registry_path), lambda: {"revision": 0, "houses": {}})
+
+
+def publish_changes(registry_path: Path, changes: List[Dict], origin: str) -> List[int]:
+    """
+    Append `{"house", "alias", "op", "agent"}` changes to the feed; returns their revisions.
+
+    `op` is "upsert" (with the full agent record) or "delete".
+    """
+    if not changes:
+        return []
+    path = feed_path(registry_path)
+    ensure_dir(path.parent)
+    with file_lock(lock_path(path)):
+        heads = load_heads(registry_path)
+        heads.pop("agents", None)  # per-agent heads were never read; stop carrying them
+        lines: List[str] = []
+        revisions: List[int] = []
+        for change in changes:
+            heads["revision"] += 1
+            revision = heads["revision"]
+            heads["houses"][change["house"]] = revision
+            lines.append(json.dumps({"rev": revision, "origin": origin, **change}, separators=(",", ":")) + "\n")
+            revisions.append(revision)
+        with open(path, "a") as f:
+            f.write("".join(lines))
+        _write_json(heads_path(registry_path), heads, indent=None)
+    return revisions
+
+
+def read_feed(registry_path: Path, since: int = 0, offset: int = 0) -> Tuple[List[Dict], int]:
+    """
+    Changes with `rev > since`, read from byte `offset`; returns (changes, next offset).
+
+    An offset past the end (feed replaced) falls back to a scan from the start.
+    """
+    path = feed_path(registry_path)
+    if not path.exists():
+        return [], 0
+    changes: List[Dict] = []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if offset > f.tell():
+            offset = 0
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # a writer is mid-append; pick it up next time
+            offset += len(line)
+            change = json.loads(line)
+            if change["rev"] > since:
+                changes.append(change)
+    return changes, offset
+
+
+def lab_edit(registry_path: Path, house_id: str, alias: str, fields: Dict, sharded: bool = False) -> int:
+    """File-based stand-in for an edit made in the lab: update the agent and publish it."""
+    updated: Dict = {}
+
+    def apply(house: Dict) -> bool:
+        for agent in house.get("agents", []):
+            if agent.get("alias") == alias:
+                agent.update(fields)
+                updated.clear()
+                updated.update(agent)
+                return True
+        return False
+
+    def apply_registry(registry: Dict) -> bool:
+        house = find_house(registry, house_id)
+        return house is not None and apply(house)
+
+    if sharded:
+        _, changed = update_house(registry_path, house_id, apply)
+    else:
+        _, changed = update_registry(registry_path, apply_registry)
+    if not changed:
+        raise KeyError(f"{house_id}/{alias} not found in {registry_path}")
+    return publish_changes(registry_path, [{"house": house_id, "alias": alias, "op": "upsert", "agent": updated}], "lab")[0]
+
+
+def run_feed_benchmark(agents: int, changes: int) -> int:
+    """Pull time after a few changes, for a small and a large history of prior changes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        registry_path = Path(tmp) / "agents.registry.json"
+        print(f"Change-feed pull benchmark: {changes} new change(s)")
+        offset = since = 0
+        for history in (agents // 100, agents):
+            backlog = [
+                {"house": f"house-{n % 500}", "alias": f"agent.{n}", "op": "upsert", "agent": {"alias": f"agent.{n}"}}
+                for n in range(history)
+            ]
+            publish_changes(registry_path, backlog, "bench")
+            since = load_heads(registry_path)["revision"]
+            offset = read_feed(registry_path, 0, 0)[1]
+            publish_changes(registry_path, backlog[:changes], "lab")
+            del backlog
+            gc.collect()  # keep the collector's pass over the backlog out of the timing
+            started = time.perf_counter()
+            pulled, _ = read_feed(registry_path, since, offset)
+            elapsed = time.perf_counter() - started
+            started = time.perf_counter()
+            scanned, _ = read_feed(registry_path, since, 0)
+            full = time.perf_counter() - started
+            total = load_heads(registry_path)["revision"]
+            print(
+                f"  feed={total:>8} rev(s): cursor pull {elapsed * 1000:7.2f} ms ({len(pulled)} change(s)), "
+                f"full scan {full * 1000:8.2f} ms ({len(scanned)} change(s))"
+            )
+    return 0
+
+
+# --- Contention benchmark ---------------------------------------------------
+
+
+def _bench_agents(house_id: str, step: int) -> List[Dict]:
+    return [{"alias": f"agent.{house_id}.{n}", "step": step} for n in range(3)]
+
+
+def _bench_writer(job: Tuple[str, int, int, bool]) -> int:
+    """Benchmark worker: register one house, then update its agent list repeatedly."""
+    registry_path, writer, updates, sharded = job
+    stats: Dict[str, int] = {}
+    house_id = f"house-{writer:04d}"
+    for step in range(updates):
+        agents = _bench_agents(house_id, step)
+        if sharded:
+
+            def mutate_house(house: Dict) -> bool:
+                house.update({"id": house_id, "name": house_id, "type": "house", "agents": agents})
+                return True
+
+            update_house(Path(registry_path), house_id, mutate_house, stats=stats)
+            continue
+
+        def mutate(registry: Dict) -> bool:
+            house = find_house(registry, house_id)
+            if house is None:
+                house = {"id": house_id, "name": house_id, "type": "house", "agents": []}
+                registry.setdefault("houses", []).append(house)
+            house["agents"] = agents
+            return True
+
+        update_registry(Path(registry_path), mutate, stats=stats)
+    return stats.get("conflicts", 0)
+
+
+def run_benchmark(writers: int, updates: int, sharded: bool) -> int:
+    """N processes update their own house concurrently; every write must survive."""
+    with tempfile.TemporaryDirectory() as tmp:
+        registry_path = Path(tmp) / "agents.registry.json"
+        registry_path.write_text(json.dumps({"houses": []}))
+        layout = "sharded" if sharded else "legacy"
+        print(f"Registry contention benchmark ({layout}): {writers} writer(s) × {updates} update(s)")
+        started = time.perf_counter()
+        jobs = [(str(registry_path), n, updates, sharded) for n in range(writers)]
+        with ProcessPoolExecutor(max_workers=writers) as pool:
+            conflicts = sum(pool.map(_bench_writer, jobs))
+        elapsed = time.perf_counter() - started
+
+        if sharded:
+            export_legacy(registry_path)
+        registry = load_registry(registry_path)
+        houses = registry.get("houses", [])
+        complete = sum(1 for house in houses if house["agents"] and house["agents"][0]["step"] == updates - 1)
+        expected = writers * updates
+        print(f"  {elapsed:7.3f}s  {expected / elapsed:8.0f} commits/s  conflicts retried={conflicts}")
+        print(f"  houses={len(houses)}  final-state={complete}")
+        lost = complete != writers
+        if not sharded:
+            print(f"  version={registry.get('version')} (expected {expected})")
+            lost = lost or registry.get("version") != expected
+        if lost:
+            print("  ❌ Lost updates detected")
+            return 1
+        print("  ✅ No lost updates")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared lab registry maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Split a legacy registry into per-house shards")
+    migrate.add_argument("registry", type=Path)
+    export = sub.add_parser("export", help="Write the legacy single-file registry from the shards")
+    export.add_argument("registry", type=Path)
+    export.add_argument("--output", type=Path, help="Destination (defaults to the registry path)")
+    bench = sub.add_parser("bench", help="Contention benchmark with N concurrent writer processes")
+    bench.add_argument("writers", type=int)
+    bench.add_argument("--updates", type=int, default=20, help="Updates per writer")
+    bench.add_argument("--sharded", action="store_true", help="Use the sharded layout")
+    edit = sub.add_parser("edit", help="Stand-in for a lab-side agent edit (updates registry + feed)")
+    edit.add_argument("registry", type=Path)
+    edit.add_argument("house")
+    edit.add_argument("alias")
+    edit.add_argument("fields", nargs="+", metavar="field=value")
+    edit.add_argument("--sharded", action="store_true", help="Registry uses the sharded layout")
+    bench_feed = sub.add_parser("bench-feed", help="Pull cost vs feed history size")
+    bench_feed.add_argument("agents", type=int, help="Prior changes in the large history")
+    bench_feed.add_argument("--changes", type=int, default=10, help="New changes to pull")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        return run_benchmark(args.writers, args.updates, args.sharded)
+    if args.command == "bench-feed":
+        return run_feed_benchmark(args.agents, args.changes)
+    if args.command == "edit":
+        fields = dict(field.split("=", 1) for field in args.fields)
+        try:
+            revision = lab_edit(args.registry, args.house, args.alias, fields, args.sharded)
+        except KeyError as exc:
+            print(f"❌ {exc.args[0]}")
+            return 1
+        print(f"✅ Published {args.house}/{args.alias} at revision {revision}")
+        return 0
+    if args.command == "migrate":
+        count = migrate_to_shards(args.registry)
+        print(f"✅ Sharded {count} house(s) into {shard_root(args.registry)}")
+        return 0
+    count = export_legacy(args.registry, args.output)
+    print(f"✅ Exported {count} house(s) to {args.output or args.registry}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
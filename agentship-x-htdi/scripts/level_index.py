@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Validate `public/data/level/*.json` levels and precompute their runtime indexes.
+
+Checks per level:
+
+- `canvas` width/height are whole multiples of the tile size, and every
+  tileset shares that tile size
+- every layer has exactly `cols * rows` integer cells (>= -1) and names an
+  existing tileset when it references one
+- a `world` layer and at least one `player_sp` spawn exist
+
+Valid levels get two generated indexes:
+
+- `spawns`: `[x, y]` cells per `*_sp` layer (any gid >= 0, matching Level.js),
+  written back into the level in the file's own JSON style (pretty-printed or
+  compact, trailing newline kept); Level.js reads it instead of scanning
+- `collision/<level>.json`: grid size plus `solid`, the world layer's solid
+  tiles (gid > 0, matching World.js) merged into `[x, y, w, h]` rectangles.
+  This is a gitignored build artifact beside the levels, kept out of the
+  shipped level files until the collision system reads it
+
+Coordinates are tile cells with Tiled's top-left origin. `--check` reports
+invalid or stale levels without writing, for CI. It skips the collision files:
+they are not committed, so a fresh clone has none to compare.
+
+Usage:
+    python level_index.py [LEVEL.json ...] [--check] [--levels-dir DIR] [--collision-dir DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils import REPO_ROOT, write_text_atomic
+
+LEVELS_DIR = REPO_ROOT / "public" / "data" / "level"
+COLLISION_DIR = LEVELS_DIR / "collision"
+WORLD_LAYER = "world"
+SPAWN_SUFFIX = "_sp"
+REQUIRED_SPAWNS = ("player_sp",)
+EMPTY = -1
+
+Rect = List[int]
+
+
+def grid_size(level: Dict, errors: List[str]) -> Optional[Tuple[int, int, int, int]]:
+    """(cols, rows, tile width, tile height), recording problems in `errors`."""
+    tilesets = level.get("tilesets") or []
+    canvas = level.get("canvas") or {}
+    if not tilesets:
+        errors.append("no tilesets")
+        return None
+    tile_w, tile_h = tilesets[0].get("tilewidth"), tilesets[0].get("tileheight")
+    if not tile_w or not tile_h:
+        errors.append(f"tileset {tilesets[0].get('name')!r} has no tile size")
+        return None
+    for tileset in tilesets[1:]:
+        if (tileset.get("tilewidth"), tileset.get("tileheight")) != (tile_w, tile_h):
+            errors.append(
+                f"tileset {tileset.get('name')!r} is {tileset.get('tilewidth')}x{tileset.get('tileheight')}, "
+                f"expected {tile_w}x{tile_h}"
+            )
+    width, height = canvas.get("width"), canvas.get("height")
+    if not width or not height:
+        errors.append("canvas has no width/height")
+        return None
+    if width % tile_w or height % tile_h:
+        errors.append(f"canvas {width}x{height} is not a multiple of the {tile_w}x{tile_h} tile size")
+    return width // tile_w, height // tile_h, tile_w, tile_h
+
+
+def validate_level(level: Dict) -> Tuple[List[str], Optional[Tuple[int, int, int, int]]]:
+    """Problems found in `level` (empty when valid) and its grid size."""
+    errors: List[str] = []
+    grid = grid_size(level, errors)
+    layers = level.get("layers") or []
+    tileset_names = {tileset.get("name") for tileset in level.get("tilesets") or []}
+    names = [layer.get("name") for layer in layers]
+
+    for layer in layers:
+        name = layer.get("name")
+        data = layer.get("data")
+        if not isinstance(data, list):
+            errors.append(f"layer {name!r} has no data array")
+            continue
+        if grid and len(data) != grid[0] * grid[1]:
+            errors.append(f"layer {name!r} has {len(data)} cells, canvas needs {grid[0]}x{grid[1]} = {grid[0] * grid[1]}")
+        bad = next((value for value in data if not isinstance(value, int) or value < EMPTY), None)
+        if bad is not None:
+            errors.append(f"layer {name!r} has invalid tile value {bad!r}")
+        if layer.get("tileset") is not None and layer["tileset"] not in tileset_names:
+            errors.append(f"layer {name!r} references unknown tileset {layer['tileset']!r}")
+    if len(set(names)) != len(names):
+        errors.append("duplicate layer names")
+    if WORLD_LAYER not in names:
+        errors.append(f"missing {WORLD_LAYER!r} layer")
+    for required in REQUIRED_SPAWNS:
+        layer = next((layer for layer in layers if layer.get("name") == required), None)
+        if layer is None or not any(isinstance(v, int) and v >= 0 for v in layer.get("data") or []):
+            errors.append(f"no {required!r} spawn points")
+    return errors, grid
+
+
+def merge_solid_rects(data: List[int], cols: int, rows: int) -> List[Rect]:
+    """
+    Cover the solid tiles with few axis-aligned rectangles.
+
+    Each row is split into maximal horizontal runs; a run extends the
+    rectangle directly above it when both span the same columns.
+    """
+    rects: List[Rect] = []
+    open_rects: Dict[Tuple[int, int], Rect] = {}
+    for y in range(rows):
+        row = data[y * cols:(y + 1) * cols]
+        current: Dict[Tuple[int, int], Rect] = {}
+        x = 0
+        while x < cols:
+            if row[x] <= 0:
+                x += 1
+                continue
+            start = x
+            while x < cols and row[x] > 0:
+                x += 1
+            span = (start, x - start)
+            rect = open_rects.pop(span, None)
+            if rect is None:
+                rect = [start, y, x - start, 0]
+                rects.append(rect)
+            rect[3] += 1
+            current[span] = rect
+        open_rects = current
+    return rects
+
+
+def extract_spawns(layers: List[Dict], cols: int) -> Dict[str, List[List[int]]]:
+    spawns: Dict[str, List[List[int]]] = {}
+    for layer in layers:
+        name = layer.get("name", "")
+        if name.endswith(SPAWN_SUFFIX):
+            spawns[name] = [[i % cols, i // cols] for i, value in enumerate(layer["data"]) if value >= 0]
+    return spawns
+
+
+def build_collision(level: Dict, grid: Tuple[int, int, int, int]) -> Dict:
+    cols, rows, tile_w, tile_h = grid
+    world = next(layer for layer in level["layers"] if layer.get("name") == WORLD_LAYER)
+    return {
+        "cols": cols,
+        "rows": rows,
+        "tileWidth": tile_w,
+        "tileHeight": tile_h,
+        "solid": merge_solid_rects(world["data"], cols, rows),
+    }
+
+
+def dump_like(level: Dict, original: str) -> str:
+    """Serialize in the source file's style: 2-space pretty-printed or compact, same trailing whitespace."""
+    if original.lstrip().startswith("{\n"):
+        body = json.dumps(level, indent=2, ensure_ascii=False)
+    else:
+        body = json.dumps(level, separators=(",", ":"), ensure_ascii=False)
+    return body + original[len(original.rstrip()):]
+
+
+def _refresh(path: Path, content: str, check: bool) -> bool:
+    """Write `content` unless `path` already holds it; returns whether it was stale."""
+    try:
+        stale = path.read_text(encoding="utf-8") != content
+    except FileNotFoundError:
+        stale = True
+    if stale and not check:
+        mode = path.stat().st_mode if path.exists() else None
+        write_text_atomic(path, content)
+        if mode is not None:
+            os.chmod(path, mode)
+    return stale
+
+
+def process_level(path: Path, check: bool = False, collision_dir: Path = COLLISION_DIR) -> Dict:
+    """Validate one level and refresh its spawns (and, unless checking, its collision file); returns a report row."""
+    row: Dict = {"name": path.stem, "errors": [], "stale": False}
+    started = time.perf_counter()
+    text = path.read_text(encoding="utf-8")
+    try:
+        level = json.loads(text)
+    except json.JSONDecodeError as exc:
+        row["errors"] = [f"invalid JSON: {exc}"]
+        return row
+    row["errors"], grid = validate_level(level)
+    validated = time.perf_counter()
+    row["validate"] = validated - started
+    if row["errors"]:
+        return row
+
+    collision = build_collision(level, grid)
+    spawns = extract_spawns(level["layers"], grid[0])
+    row["index"] = time.perf_counter() - validated
+    world = next(layer for layer in level["layers"] if layer.get("name") == WORLD_LAYER)
+    row["solid_tiles"] = sum(1 for value in world["data"] if value > 0)
+    row["rects"] = len(collision["solid"])
+    row["spawns"] = sum(len(cells) for cells in spawns.values())
+
+    # Earlier versions of this tool wrote the rectangles into the level itself.
+    updated = {key: value for key, value in level.items() if key != "collision"}
+    updated["spawns"] = spawns
+    row["stale"] = _refresh(path, dump_like(updated, text), check)
+    if not check:
+        _refresh(collision_dir / f"{path.stem}.json", json.dumps(collision, separators=(",", ":")) + "\n", False)
+    return row
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate levels and precompute spawns and collision rectangles.")
+    parser.add_argument("levels", nargs="*", type=Path, help="Level files (default: every level in --levels-dir)")
+    parser.add_argument("--levels-dir", type=Path, default=LEVELS_DIR, help="Directory of level JSON files")
+    parser.add_argument("--collision-dir", type=Path, default=COLLISION_DIR, help="Where to write collision rectangles")
+    parser.add_argument("--check", action="store_true", help="Report invalid or stale levels without writing")
+    args = parser.parse_args(argv)
+
+    paths = args.levels or sorted(args.levels_dir.glob("*.json"))
+    if not paths:
+        print(f"No level files found in {args.levels_dir}")
+        return 1
+
+    started = time.perf_counter()
+    failed = 0
+    print(f"{'level':<16}{'solid':>7}{'rects':>7}{'spawns':>8}{'validate':>11}{'index':>10}  status")
+    for path in paths:
+        row = process_level(path, args.check, args.collision_dir)
+        if row["errors"]:
+            failed += 1
+            print(f"{row['name']:<16}{'':>32}  ❌ invalid")
+            for error in row["errors"]:
+                print(f"    - {error}")
+            continue
+        if row["stale"]:
+            status = "⚠️  stale" if args.check else "✅ updated"
+            failed += args.check
+        else:
+            status = "✅ up to date"
+        print(
+            f"{row['name']:<16}{row['solid_tiles']:>7}{row['rects']:>7}{row['spawns']:>8}"
+            f"{row['validate'] * 1000:>8.2f} ms{row['index'] * 1000:>7.2f} ms  {status}"
+        )
+    print(f"Processed {len(paths)} level(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Pack `public/data/level/*.json` levels into a compact binary format.
+
+Layout of a `.lvlb` file (little-endian):
+
+- header: magic `LVLB`, format version (u8), layer count (u8), canvas
+  width/height (u16 each), tile width/height (u16 each), metadata length (u32)
+- metadata: compact UTF-8 JSON of the level with every layer's `data`
+  replaced by `null` (tilesets, canvas, layer names, and any other keys)
+- per layer, in metadata order: encoding (u8), cell count (u32), payload
+  length (u32), payload
+
+Each layer uses whichever encoding is smallest: a raw int8/int16 typed array
+or run-length pairs `(run u8, value i8)` / `(run u16, value i16)`. Every
+packed file is decoded again and compared with its source before it is
+written; the report lists raw and gzip sizes per level.
+
+The game loads these through `loadLevelData` in src/Level.js (decoder in
+src/utils/LevelPack.js), which falls back to the JSON and logs fetch/decode
+times in the browser console. The `.lvlb` files are committed: rerun this
+after editing a level, and use `--check` in CI.
+
+Usage:
+    python level_pack.py [--levels-dir DIR] [--out-dir DIR] [--check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils import REPO_ROOT
+
+LEVELS_DIR = REPO_ROOT / "public" / "data" / "level"
+MAGIC = b"LVLB"
+FORMAT_VERSION = 1
+SUFFIX = ".lvlb"
+HEADER = struct.Struct("<4sBBHHHHI")
+LAYER_HEADER = struct.Struct("<BII")
+DEFAULT_TILE = 32
+
+RAW_I8, RAW_I16, RLE_I8, RLE_I16 = range(4)
+# RLE encoding -> (pair struct, longest run one pair can hold)
+RLE_FORMATS = {RLE_I8: (struct.Struct("<Bb"), 255), RLE_I16: (struct.Struct("<Hh"), 65535)}
+I8_RANGE = range(-128, 128)
+I16_RANGE = range(-32768, 32768)
+
+
+class LevelFormatError(ValueError):
+    """A level that cannot be packed, or a `.lvlb` file that cannot be read."""
+
+
+def _runs(values: List[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for value in values:
+        if runs and runs[-1][1] == value:
+            runs[-1] = (runs[-1][0] + 1, value)
+        else:
+            runs.append((1, value))
+    return runs
+
+
+def encode_layer(values: List[int]) -> Tuple[int, bytes]:
+    """Smallest (encoding, payload) for one layer's tile values."""
+    if not all(isinstance(value, int) for value in values):
+        raise LevelFormatError("tile values must be integers")
+    low, high = (min(values), max(values)) if values else (0, 0)
+    wide = not (low in I8_RANGE and high in I8_RANGE)
+    if wide and not (low in I16_RANGE and high in I16_RANGE):
+        raise LevelFormatError(f"tile values {low}..{high} do not fit in 16 bits")
+
+    raw = array("h" if wide else "b", values)
+    if sys.byteorder != "little":
+        raw.byteswap()
+    candidates = [(RAW_I16 if wide else RAW_I8, raw.tobytes())]
+
+    encoding = RLE_I16 if wide else RLE_I8
+    pair, max_run = RLE_FORMATS[encoding]
+    chunks = []
+    for run, value in _runs(values):
+        while run:
+            step = min(run, max_run)
+            chunks.append(pair.pack(step, value))
+            run -= step
+    candidates.append((encoding, b"".join(chunks)))
+    return min(candidates, key=lambda candidate: len(candidate[1]))
+
+
+def decode_layer(encoding: int, cells: int, payload: bytes) -> List[int]:
+    if encoding in (RAW_I8, RAW_I16):
+        values = array("h" if encoding == RAW_I16 else "b")
+        values.frombytes(payload)
+        if sys.byteorder != "little":
+            values.byteswap()
+        decoded = values.tolist()
+    elif encoding in RLE_FORMATS:
+        decoded = []
+        for run, value in RLE_FORMATS[encoding][0].iter_unpack(payload):
+            decoded.extend([value] * run)
+    else:
+        raise LevelFormatError(f"unknown layer encoding {encoding}")
+    if len(decoded) != cells:
+        raise LevelFormatError(f"layer decoded to {len(decoded)} cells, header says {cells}")
+    return decoded
+
+
+def pack_level(level: Dict) -> bytes:
+    layers = level.get("layers", [])
+    if len(layers) > 255:
+        raise LevelFormatError("more than 255 layers")
+    canvas = level.get("canvas", {})
+    tileset = (level.get("tilesets") or [{}])[0]
+    meta = dict(level, layers=[dict(layer, data=None) for layer in layers])
+    meta_bytes = json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    parts = [
+        HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(layers),
+            canvas.get("width", 0),
+            canvas.get("height", 0),
+            tileset.get("tilewidth", DEFAULT_TILE),
+            tileset.get("tileheight", DEFAULT_TILE),
+            len(meta_bytes),
+        ),
+        meta_bytes,
+    ]
+    for layer in layers:
+        values = layer.get("data") or []
+        encoding, payload = encode_layer(values)
+        parts.append(LAYER_HEADER.pack(encoding, len(values), len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def unpack_level(blob: bytes) -> Dict:
+    if len(blob) < HEADER.size:
+        raise LevelFormatError("file is shorter than the header")
+    magic, version, layer_count, *_, meta_len = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise LevelFormatError("not a packed level (bad magic)")
+    if version != FORMAT_VERSION:
+        raise LevelFormatError(f"unsupported format version {version}")
+    pos = HEADER.size
+    level = json.loads(blob[pos:pos + meta_len].decode("utf-8"))
+    pos += meta_len
+    layers = level.get("layers", [])
+    if len(layers) != layer_count:
+        raise LevelFormatError(f"metadata lists {len(layers)} layers, header says {layer_count}")
+    for layer in layers:
+        encoding, cells, length = LAYER_HEADER.unpack_from(blob, pos)
+        pos += LAYER_HEADER.size
+        layer["data"] = decode_layer(encoding, cells, blob[pos:pos + length])
+        pos += length
+    if pos != len(blob):
+        raise LevelFormatError(f"{len(blob) - pos} trailing byte(s)")
+    return level
+
+
+def pack_file(source: Path, target: Path, check: bool = False) -> Optional[Dict]:
+    """Pack one level after verifying the round trip; returns report stats, or None on failure."""
+    text = source.read_text(encoding="utf-8")
+    level = json.loads(text)
+    try:
+        blob = pack_level(level)
+        if unpack_level(blob) != level:
+            raise LevelFormatError("round trip changed the level")
+    except LevelFormatError as exc:
+        print(f"❌ {source.name}: {exc}")
+        return None
+
+    if check:
+        if not target.exists() or target.read_bytes() != blob:
+            print(f"❌ {target.name} is missing or stale; run level_pack.py")
+            return None
+    elif not target.exists() or target.read_bytes() != blob:
+        target.write_bytes(blob)
+
+    return {
+        "name": source.stem,
+        "json_bytes": len(text.encode("utf-8")),
+        "packed_bytes": len(blob),
+        "json_gzip": len(gzip.compress(text.encode("utf-8"), 9)),
+        "packed_gzip": len(gzip.compress(blob, 9)),
+    }
+
+
+def print_report(rows: List[Dict]) -> None:
+    print(f"{'level':<16}{'json':>9}{'packed':>9}{'gzip json':>11}{'gzip packed':>13}")
+    for row in rows:
+        print(
+            f"{row['name']:<16}{row['json_bytes']:>9}{row['packed_bytes']:>9}"
+            f"{row['json_gzip']:>11}{row['packed_gzip']:>13}"
+        )
+    total_json = sum(row["json_bytes"] for row in rows)
+    total_packed = sum(row["packed_bytes"] for row in rows)
+    if total_json:
+        print(
+            f"Total: {total_json} → {total_packed} bytes "
+            f"({100 * (1 - total_packed / total_json):.1f}% smaller)"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Pack level JSON into the compact .lvlb format.")
+    parser.add_argument("--levels-dir", type=Path, default=LEVELS_DIR, help="Directory of level JSON files")
+    parser.add_argument("--out-dir", type=Path, help="Where to write .lvlb files (default: next to the JSON)")
+    parser.add_argument("--check", action="store_true", help="Fail if any .lvlb file is missing or stale")
+    args = parser.parse_args(argv)
+
+    sources = sorted(args.levels_dir.glob("*.json"))
+    if not sources:
+        print(f"No level files found in {args.levels_dir}")
+        return 1
+    out_dir = args.out_dir or args.levels_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = []
+    failed = 0
+    for source in sources:
+        row = pack_file(source, out_dir / f"{source.stem}{SUFFIX}", args.check)
+        if row is None:
+            failed += 1
+        else:
+            rows.append(row)
+    print_report(rows)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,8 @@ One-time setup script to add this repo to the central registry
 import json
 import sys
 from pathlib import Path
-from datetime import datetime
+
+import lab_registry
 
 # Paths
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -28,44 +29,53 @@ def main():
         config = json.load(f)
 
     # Load registry
-    if not LAB_REGISTRY_PATH.exists():
+    if not (LAB_REGISTRY_PATH.exists() or lab_registry.shard_root(LAB_REGISTRY_PATH).exists()):
         print(f"❌ Lab registry not found: {LAB_REGISTRY_PATH}")
         print("Make sure htdi-agentic-lab is cloned and set up.")
         sys.exit(1)
 
-    with open(LAB_REGISTRY_PATH, "r") as f:
-        registry = json.load(f)
+    house_id = config["house"]["id"]
+    existing: dict = {}
+
+    def register(registry: dict) -> bool:
+        """Add the house unless it is already present (re-run on version conflicts)"""
+        existing.pop("house", None)
+        house = lab_registry.find_house(registry, house_id)
+        if house is not None:
+            existing["house"] = house
+            return False
+
+        registry.setdefault("houses", []).append({
+            "id": house_id,
+            "name": config["house"]["name"],
+            "type": config["house"]["type"],
+            "agentshipVersion": config["house"]["agentshipVersion"],
+            "description": config["house"]["description"],
+            "repository": config["house"]["repository"]["url"],
+            "agents": []
+        })
+        return True
+
+    def register_shard(house: dict) -> bool:
+        registry = {"houses": [house] if house else []}
+        if not register(registry):
+            return False
+        house.update(registry["houses"][0])
+        return True
+
+    # Locked, version-checked write so concurrent registrations don't clobber each other
+    if config["lab"].get("registryLayout") == "sharded":
+        lab_registry.update_house(LAB_REGISTRY_PATH, house_id, register_shard)
+    else:
+        lab_registry.update_registry(LAB_REGISTRY_PATH, register)
 
     # Check if already registered
-    house_id = config["house"]["id"]
-    for house in registry.get("houses", []):
-        if house["id"] == house_id:
-            print(f"✅ House already registered: {house_id}")
-            print(f"   Name: {house['name']}")
-            print(f"   Agents: {len(house.get('agents', []))}")
-            return
-
-    # Create house entry
-    house_entry = {
-        "id": house_id,
-        "name": config["house"]["name"],
-        "type": config["house"]["type"],
-        "agentshipVersion": config["house"]["agentshipVersion"],
-        "description": config["house"]["description"],
-        "repository": config["house"]["repository"]["url"],
-        "agents": []
-    }
-
-    # Add to registry
-    if "houses" not in registry:
-        registry["houses"] = []
-
-    registry["houses"].append(house_entry)
-    registry["generatedAt"] = datetime.utcnow().isoformat() + "Z"
-
-    # Save registry
-    with open(LAB_REGISTRY_PATH, "w") as f:
-        json.dump(registry, f, indent=2)
+    if "house" in existing:
+        house = existing["house"]
+        print(f"✅ House already registered: {house_id}")
+        print(f"   Name: {house['name']}")
+        print(f"   Agents: {len(house.get('agents', []))}")
+        return
 
     print(f"✅ House registered successfully!")
     print(f"   ID: {house_id}")
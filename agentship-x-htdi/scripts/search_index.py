@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Incremental full-text index over session logs, handoff entries, and audits.
+
+Documents live in an SQLite FTS5 table (`search.sqlite3`, env
+`AGENT_SEARCH_INDEX`) with one row per session log, per handoff entry, and
+per audit. `update` only re-reads files whose (mtime, size) changed and only
+re-indexes those whose content hash changed; files that disappeared drop
+their rows. Handoff entries are indexed per segment file, so an append
+re-indexes the active segment only.
+
+Queries are ranked with bm25 and return highlighted snippets, so callers
+such as agent_cli can attach prior context without loading every file.
+
+Usage:
+    python search_index.py update
+    python search_index.py query "shadow pass" [--kind session] [--project NAME] [--limit N]
+    python search_index.py bench SESSIONS
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import handoff_log
+import session_store
+from utils import AGENTS_DIR
+
+SEARCH_PATH = Path(os.environ.get("AGENT_SEARCH_INDEX", AGENTS_DIR / "search.sqlite3"))
+KINDS = ("session", "handoff", "audit")
+SNIPPET_TOKENS = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    project TEXT,
+    ref TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_docs_path ON docs (path);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(title, body, tokenize = 'porter unicode61');
+"""
+
+HEADING_PATTERN = re.compile(r"^#{1,2}\s+(.+)$", re.MULTILINE)
+TERM_PATTERN = re.compile(r"\w+(?:-\w+)*", re.UNICODE)
+
+# (path relative to AGENTS_DIR, kind, project) for every indexed file
+Source = Tuple[str, str, Optional[str]]
+# (ref, title, body) for every document extracted from one file
+Document = Tuple[str, str, str]
+
+
+def connect(path: Path | str = SEARCH_PATH) -> sqlite3.Connection:
+    """Open the index, creating the schema if needed."""
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def iter_sources(root: Path = AGENTS_DIR) -> Iterator[Source]:
+    """Session logs (via each project's session index), handoff segments, and audits."""
+    projects_dir = root / "projects"
+    if projects_dir.is_dir():
+        for project_dir in sorted(p for p in projects_dir.iterdir() if p.is_dir()):
+            for path in session_store.session_paths(project_dir):
+                yield path.relative_to(root).as_posix(), "session", project_dir.name
+    segments_dir = root / handoff_log.SEGMENTS_DIR.relative_to(AGENTS_DIR)
+    if segments_dir.is_dir():
+        for path in sorted(segments_dir.glob("segment-*.md")):
+            yield path.relative_to(root).as_posix(), "handoff", None
+    audits_dir = root / "audits"
+    if audits_dir.is_dir():
+        for path in sorted(audits_dir.glob("*.md")):
+            project = path.stem if (projects_dir / path.stem).is_dir() else None
+            yield path.relative_to(root).as_posix(), "audit", project
+
+
+def _title(text: str, fallback: str) -> str:
+    match = HEADING_PATTERN.search(text)
+    return match.group(1).strip() if match else fallback
+
+
+def _handoff_records(root: Path) -> Dict[str, List[Tuple[int, list]]]:
+    """Handoff index records grouped by segment, with their `handoff_log.py show` position."""
+    index_file = root / handoff_log.INDEX_FILE.relative_to(AGENTS_DIR)
+    grouped: Dict[str, List[Tuple[int, list]]] = {}
+    if not index_file.exists():
+        return grouped
+    with index_file.open(encoding="utf-8") as handle:
+        for position, line in enumerate(line for line in handle if line.strip()):
+            record = json.loads(line)
+            grouped.setdefault(record[0], []).append((position, record))
+    return grouped
+
+
+def extract_documents(data: bytes, rel: str, kind: str, handoffs: Dict[str, List[Tuple[int, list]]]) -> List[Document]:
+    if kind != "handoff":
+        text = data.decode("utf-8", errors="replace")
+        return [(rel, _title(text, Path(rel).stem), text)]
+    documents = []
+    for position, record in handoffs.get(Path(rel).name, []):
+        _, offset, length, date, title = record[:5]
+        body = data[offset:offset + length].decode("utf-8", errors="replace")
+        documents.append((f"handoff #{position}", f"{date} — {title}", body))
+    return documents
+
+
+def update_index(conn: sqlite3.Connection, root: Path = AGENTS_DIR) -> Dict[str, int]:
+    """Bring the index up to date; returns counts of added/updated/removed/unchanged files."""
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    known = {row["path"]: row for row in conn.execute("SELECT * FROM files")}
+    handoffs: Optional[Dict[str, List[Tuple[int, list]]]] = None
+    seen = set()
+
+    with conn:
+        for rel, kind, project in iter_sources(root):
+            seen.add(rel)
+            path = root / rel
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            row = known.get(rel)
+            if row and row["mtime_ns"] == stat.st_mtime_ns and row["size"] == stat.st_size:
+                stats["unchanged"] += 1
+                continue
+            data = path.read_bytes()
+            digest = hashlib.sha1(data).hexdigest()
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, hash) VALUES (?, ?, ?, ?)",
+                (rel, stat.st_mtime_ns, stat.st_size, digest),
+            )
+            if row and row["hash"] == digest:
+                stats["unchanged"] += 1
+                continue
+            if kind == "handoff" and handoffs is None:
+                handoffs = _handoff_records(root)
+            _drop_documents(conn, rel)
+            for ref, title, body in extract_documents(data, rel, kind, handoffs or {}):
+                cursor = conn.execute(
+                    "INSERT INTO docs (path, kind, project, ref, title) VALUES (?, ?, ?, ?, ?)",
+                    (rel, kind, project, ref, title),
+                )
+                conn.execute("INSERT INTO docs_fts (rowid, title, body) VALUES (?, ?, ?)", (cursor.lastrowid, title, body))
+            stats["updated" if row else "added"] += 1
+
+        for rel in set(known) - seen:
+            _drop_documents(conn, rel)
+            conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+            stats["removed"] += 1
+    return stats
+
+
+def _drop_documents(conn: sqlite3.Connection, rel: str) -> None:
+    conn.execute("DELETE FROM docs_fts WHERE rowid IN (SELECT id FROM docs WHERE path = ?)", (rel,))
+    conn.execute("DELETE FROM docs WHERE path = ?", (rel,))
+
+
+def match_expression(text: str, any_term: bool = False) -> str:
+    """
+    Quote each word so task IDs like `WBR-001` and stray punctuation are searched literally.
+
+    In any-term mode words under three characters are dropped; they would match nearly everything.
+    """
+    terms = [
+        '"{}"'.format(term.replace('"', '""'))
+        for term in TERM_PATTERN.findall(text)
+        if not any_term or len(term) >= 3
+    ]
+    return (" OR " if any_term else " ").join(terms)
+
+
+def search(
+    conn: sqlite3.Connection,
+    text: str,
+    kinds: Iterable[str] = (),
+    project: Optional[str] = None,
+    limit: int = 10,
+    any_term: bool = False,
+) -> List[sqlite3.Row]:
+    """Best bm25 matches (title weighted above body) with a highlighted body snippet."""
+    expression = match_expression(text, any_term)
+    if not expression:
+        return []
+    sql = [
+        "SELECT d.path, d.kind, d.project, d.ref, d.title,",
+        f" snippet(docs_fts, 1, '[', ']', ' … ', {SNIPPET_TOKENS}) AS snippet,",
+        " bm25(docs_fts, 5.0, 1.0) AS score",
+        " FROM docs_fts JOIN docs AS d ON d.id = docs_fts.rowid",
+        " WHERE docs_fts MATCH ?",
+    ]
+    params: List[object] = [expression]
+    kinds = list(kinds)
+    if kinds:
+        sql.append(f" AND d.kind IN ({', '.join('?' * len(kinds))})")
+        params.extend(kinds)
+    if project:
+        sql.append(" AND d.project = ?")
+        params.append(project)
+    sql.append(" ORDER BY score LIMIT ?")
+    params.append(limit)
+    return conn.execute("".join(sql), params).fetchall()
+
+
+def format_hit(row: sqlite3.Row) -> str:
+    location = row["path"] if row["kind"] != "handoff" else f"{row['path']} ({row['ref']})"
+    snippet = " ".join(row["snippet"].split())
+    return f"[{row['kind']}] {row['title']}\n  {location}\n  {snippet}"
+
+
+def _write_bench_tree(root: Path, count: int) -> None:
+    for idx in range(count):
+        sessions_dir = root / "projects" / f"bench-{idx % 10}" / "sessions"
+        sessions_dir.mkdir(parents=True, exist_ok=True)
+        (sessions_dir / f"20251115-0900{idx % 60:02d}-BEN-{idx:05d}.md").write_text(
+            f"# Session Log - BEN-{idx}\n\n**Task:** Synthetic task {idx}\n\n## Approach\n\n"
+            + f"Tuned the shadow pass and particle budget for level {idx % 40}.\n" * 20,
+            encoding="utf-8",
+        )
+
+
+def run_benchmark(count: int) -> int:
+    """Time a cold build, a no-op update, a one-file update, and a query over synthetic logs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _write_bench_tree(root, count)
+        conn = connect(root / "search.sqlite3")
+        print(f"Search index benchmark: {count} session log(s)")
+
+        def timed(label: str, action) -> None:
+            started = time.perf_counter()
+            result = action()
+            print(f"  {label:<18} {(time.perf_counter() - started) * 1000:9.2f} ms  {result}")
+
+        timed("cold build", lambda: update_index(conn, root))
+        timed("no-op update", lambda: update_index(conn, root))
+        changed = next((root / "projects" / "bench-0" / "sessions").glob("*.md"))
+        changed.write_text(changed.read_text(encoding="utf-8") + "\nFollow-up: culling regression.\n", encoding="utf-8")
+        timed("one-file update", lambda: update_index(conn, root))
+        timed("query", lambda: f"{len(search(conn, 'culling regression'))} hit(s)")
+        started = time.perf_counter()
+        hits = sum(
+            "culling regression" in path.read_text(encoding="utf-8")
+            for path in (root / "projects").glob("*/sessions/*.md")
+        )
+        print(f"  {'grep-style scan':<18} {(time.perf_counter() - started) * 1000:9.2f} ms  {hits} hit(s)")
+        conn.close()
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Full-text search over sessions, handoffs, and audits.")
+    parser.add_argument("--db", type=Path, default=SEARCH_PATH, help="Index path (env AGENT_SEARCH_INDEX)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("update", help="Index new and changed files")
+    query = sub.add_parser("query", help="Ranked search with snippets (updates the index first)")
+    query.add_argument("text")
+    query.add_argument("--kind", action="append", choices=KINDS, help="Restrict to a document kind (repeatable)")
+    query.add_argument("--project", help="Restrict to one project folder")
+    query.add_argument("--limit", type=int, default=10)
+    query.add_argument("--any", action="store_true", help="Match any term instead of all terms")
+    bench = sub.add_parser("bench", help="Time builds and queries over synthetic session logs")
+    bench.add_argument("sessions", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "bench":
+            return run_benchmark(args.sessions)
+        conn = connect(args.db)
+    except sqlite3.OperationalError as exc:
+        print(f"SQLite FTS5 is unavailable: {exc}")
+        return 1
+
+    started = time.perf_counter()
+    stats = update_index(conn)
+    if args.command == "update":
+        print(
+            f"Indexed {stats['added']} new, {stats['updated']} changed, {stats['removed']} removed, "
+            f"{stats['unchanged']} unchanged file(s) in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return 0
+
+    hits = search(conn, args.text, args.kind or (), args.project, args.limit, args.any)
+    if not hits:
+        print("No matches.")
+        return 1
+    for row in hits:
+        print(format_hit(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Aggregate cycle time, WIP, and throughput from project session logs.
+
+Every `projects/*/sessions/*.md` log is streamed line by line for its task ID,
+start/end timestamps, and status. Both layouts in the tree are understood:
+
+- executor logs (`20251115-030542-WBR-001.md`): `**Task ID:**`/`**Started:**`,
+  `**Session Start:**`, `**Completed:**`/`**Completion Time:**`, `**Status:**`
+- template logs (`*-session.md`): `**Date**`, `**Start Time**`, `**End Time**`,
+  `**Elapsed (HH:MM)**`, `**Associated Tasks / Issues**`
+
+Logs are listed from each project's session index (see session_store.py;
+run its `reindex` after adding logs by hand), and parsed records are
+cached per file by (mtime, size) in `.cache/sessions.json`, so a rerun only
+opens logs that changed.
+
+Usage:
+    python session_analytics.py [--project NAME] [--benchmark SESSIONS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import calendar
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import session_store
+from utils import AGENTS_DIR, CACHE_DIR, load_json_cache, save_json_cache
+
+PROJECTS_DIR = AGENTS_DIR / "projects"
+CACHE_FILE = CACHE_DIR / "sessions.json"
+CACHE_VERSION = 1
+
+# (task_id, start, end, status) with timestamps as epoch seconds (UTC-naive).
+SessionRecord = Tuple[Optional[str], Optional[int], Optional[int], Optional[str]]
+
+FIELD_PATTERN = re.compile(r"^(?:[-*]\s*)?\*\*([^*]+?):?\*\*:?\s*(.*)$")
+HEADING_PATTERN = re.compile(r"^#\s+Session Log\s*[-:]\s*([A-Z]+-\d+)")
+TASK_ID_PATTERN = re.compile(r"\b([A-Z]{2,}-\d+)\b")
+DATETIME_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})[ T](\d{1,2}):(\d{2})(?::(\d{2}))?")
+DATE_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+CLOCK_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})")
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(minute|min|hour|hr|h\b)", re.IGNORECASE)
+FILENAME_STAMPS = (
+    re.compile(r"^(\d{4})(\d{2})(\d{2})-(\d{2})(\d{2})(\d{2})"),
+    re.compile(r"^(\d{4})-(\d{2})-(\d{2})T(\d{2})-(\d{2})"),
+)
+
+START_KEYS = {"session start", "started"}
+END_KEYS = {"completed", "completion time"}
+TASK_KEYS = {"task id", "associated tasks / issues"}
+DAY = 24 * 3600
+
+
+def _epoch(*parts: str | int | None) -> int:
+    year, month, day, hour, minute, second = (int(p or 0) for p in (list(parts) + [0] * 6)[:6])
+    return calendar.timegm((year, month, day, hour, minute, second))
+
+
+def _parse_datetime(value: str) -> Optional[int]:
+    match = DATETIME_PATTERN.search(value)
+    return _epoch(*match.groups()) if match else None
+
+
+def _parse_clock(value: str) -> Optional[int]:
+    """Seconds since midnight for an `HH:MM` value."""
+    match = CLOCK_PATTERN.match(value)
+    return int(match.group(1)) * 3600 + int(match.group(2)) * 60 if match else None
+
+
+def _parse_duration(value: str) -> Optional[int]:
+    """Seconds for `HH:MM`, `~45 minutes`, or `2 hours`."""
+    clock = _parse_clock(value)
+    if clock is not None:
+        return clock
+    match = DURATION_PATTERN.search(value)
+    if not match:
+        return None
+    amount = float(match.group(1))
+    return int(amount * (60 if match.group(2).lower().startswith("m") else 3600))
+
+
+def normalize_status(value: str) -> Optional[str]:
+    text = value.strip().lower()
+    if not text or text.startswith("["):
+        return None
+    if "partial" in text:
+        return "partial"
+    if "block" in text:
+        return "blocked"
+    if "complete" in text or "done" in text:
+        return "completed"
+    return re.sub(r"[^a-z ]", "", text).strip() or None
+
+
+def _filename_start(name: str) -> Optional[int]:
+    for pattern in FILENAME_STAMPS:
+        match = pattern.match(name)
+        if match:
+            return _epoch(*match.groups())
+    return None
+
+
+def parse_session(path: Path) -> SessionRecord:
+    """Stream one session log and extract (task_id, start, end, status)."""
+    task_id: Optional[str] = None
+    start = end = duration = None
+    date = start_clock = end_clock = None
+    status: Optional[str] = None
+
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if not task_id and line.startswith("#"):
+                heading = HEADING_PATTERN.match(line)
+                if heading:
+                    task_id = heading.group(1)
+                continue
+            match = FIELD_PATTERN.match(line.strip())
+            if not match:
+                continue
+            key = match.group(1).strip().lower()
+            value = match.group(2).strip().strip("`").strip()
+            if key in TASK_KEYS:
+                found = TASK_ID_PATTERN.search(value)
+                if found and not task_id:
+                    task_id = found.group(1)
+            elif key in START_KEYS:
+                start = _parse_datetime(value) or start
+            elif key in END_KEYS:
+                end = _parse_datetime(value) or end
+            elif key == "status":
+                status = normalize_status(value) or status
+            elif key == "date":
+                found = DATE_PATTERN.search(value)
+                date = _epoch(*found.groups()) if found else date
+            elif key == "start time":
+                start_clock = _parse_clock(value)
+            elif key == "end time":
+                end_clock = _parse_clock(value)
+            elif key in {"duration", "elapsed (hh:mm)", "elapsed"}:
+                duration = _parse_duration(value) or duration
+
+    if not task_id:
+        found = TASK_ID_PATTERN.search(path.stem)
+        task_id = found.group(1) if found else None
+    if start is None and date is not None and start_clock is not None:
+        start = date + start_clock
+    if end is None and date is not None and end_clock is not None:
+        end = date + end_clock
+        if start is not None and end < start:
+            end += DAY
+    if start is None:
+        start = _filename_start(path.name)
+    if duration and start is not None and (end is None or end <= start):
+        end = start + duration
+    if status is None and end is not None and end_clock is not None:
+        # Template logs have no status field; a filled-in end time marks the session done.
+        status = "completed"
+    return task_id, start, end, status
+
+
+def scan_sessions(
+    project_dirs: Iterable[Path],
+    cache_path: Path = CACHE_FILE,
+) -> Tuple[Dict[str, List[SessionRecord]], int]:
+    """
+    Parse session logs for each project, reusing cached records for unchanged files.
+
+    Returns records keyed by project name and the number of files actually parsed.
+    """
+    cache = load_json_cache(cache_path, CACHE_VERSION).get("files", {})
+    files: Dict[str, list] = {}
+    records: Dict[str, List[SessionRecord]] = {}
+    parsed = 0
+
+    for project_dir in project_dirs:
+        project_records: List[SessionRecord] = []
+        sessions_dir = session_store.sessions_dir(project_dir)
+        for path in session_store.session_paths(project_dir):
+            try:
+                stat = os.stat(path, follow_symlinks=False)
+            except OSError:
+                continue  # deleted after the index was loaded
+            key = f"{project_dir.name}/{path.relative_to(sessions_dir).as_posix()}"
+            cached = cache.get(key)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                record = tuple(cached[2])
+            else:
+                record = parse_session(path)
+                parsed += 1
+            files[key] = [stat.st_mtime_ns, stat.st_size, list(record)]
+            project_records.append(record)
+        records[project_dir.name] = project_records
+
+    # Keep cached entries for projects outside this scan so partial scans don't evict them.
+    scanned = set(records)
+    for key, value in cache.items():
+        if key.split("/", 1)[0] not in scanned:
+            files[key] = value
+    if parsed or len(files) != len(cache):
+        save_json_cache(cache_path, {"files": files}, CACHE_VERSION)
+    return records, parsed
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def project_metrics(records: List[SessionRecord]) -> Dict[str, object]:
+    """
+    Per-project flow metrics.
+
+    Cycle time runs from a task's first session start to its last completed
+    session end; WIP counts tasks with sessions but no completed one; throughput
+    is completed tasks per week across the span of logged activity.
+    """
+    tasks: Dict[str, List[Optional[int]]] = {}
+    completed_sessions = 0
+    for task_id, start, end, status in records:
+        done = status == "completed"
+        completed_sessions += done
+        key = task_id or f"untracked-{len(tasks)}"
+        first_start, last_done = tasks.get(key, [None, None])
+        if start is not None and (first_start is None or start < first_start):
+            first_start = start
+        if done and end is not None and (last_done is None or end > last_done):
+            last_done = end
+        tasks[key] = [first_start, last_done]
+
+    cycle_hours = [
+        (last_done - first_start) / 3600
+        for first_start, last_done in tasks.values()
+        if first_start is not None and last_done is not None
+    ]
+    done_tasks = sum(1 for _, last_done in tasks.values() if last_done is not None)
+    starts = [s for s, _ in tasks.values() if s is not None]
+    ends = [e for _, e in tasks.values() if e is not None]
+    span_weeks = 1.0
+    if starts and ends:
+        span_weeks = max(1.0, (max(ends) - min(starts)) / (7 * DAY))
+
+    return {
+        "sessions": len(records),
+        "completed_sessions": completed_sessions,
+        "tasks": len(tasks),
+        "completed_tasks": done_tasks,
+        "wip": len(tasks) - done_tasks,
+        "cycle_median_h": statistics.median(cycle_hours) if cycle_hours else None,
+        "cycle_p90_h": _percentile(cycle_hours, 0.9) if cycle_hours else None,
+        "throughput_per_week": done_tasks / span_weeks,
+    }
+
+
+def collect_metrics(
+    project_dirs: Iterable[Path],
+    cache_path: Path = CACHE_FILE,
+) -> Dict[str, Dict[str, object]]:
+    records, _ = scan_sessions(project_dirs, cache_path)
+    return {name: project_metrics(project_records) for name, project_records in records.items()}
+
+
+def render_metrics_lines(metrics: Optional[Dict[str, object]]) -> List[str]:
+    """Markdown lines for the audit's `### Session Metrics` block."""
+    lines = ["### Session Metrics"]
+    if not metrics or not metrics["sessions"]:
+        lines.append("- No session logs recorded yet.")
+        return lines
+    lines.append(f"- Sessions logged — {metrics['sessions']} ({metrics['completed_sessions']} completed)")
+    if metrics["cycle_median_h"] is not None:
+        lines.append(
+            f"- Cycle time — median {metrics['cycle_median_h']:.1f} h, "
+            f"p90 {metrics['cycle_p90_h']:.1f} h ({metrics['completed_tasks']} task(s))"
+        )
+    else:
+        lines.append("- Cycle time — no completed tasks yet")
+    lines.append(f"- WIP — {metrics['wip']} task(s) with open sessions")
+    lines.append(f"- Throughput — {metrics['throughput_per_week']:.2f} task(s)/week")
+    return lines
+
+
+def _write_synthetic_sessions(root: Path, count: int) -> None:
+    """Populate `root` with executor-style logs spread over 10 projects."""
+    for idx in range(count):
+        sessions_dir = root / f"bench-{idx % 10}" / "sessions"
+        sessions_dir.mkdir(parents=True, exist_ok=True)
+        day = 1 + idx % 28
+        (sessions_dir / f"202511{day:02d}-{idx % 24:02d}0000-BEN-{idx:05d}.md").write_text(
+            f"# Session Log - BEN-{idx}\n\n**Task:** Synthetic\n"
+            f"**Started:** 2025-11-{day:02d} {idx % 24:02d}:00:00\n\n---\n\n## Approach\n\n"
+            + "Body text.\n" * 40
+            + f"\n## Session End\n\n**Completed:** 2025-11-{day:02d} {idx % 24:02d}:45:00\n"
+            f"**Status:** {'Completed' if idx % 3 else 'Blocked'}\n",
+            encoding="utf-8",
+        )
+
+
+def run_benchmark(count: int) -> int:
+    """Time a cold scan and a warm (fully cached) scan over synthetic logs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "projects"
+        cache_path = Path(tmp) / "sessions.json"
+        _write_synthetic_sessions(root, count)
+        dirs = sorted(p for p in root.iterdir() if p.is_dir())
+        print(f"Session analytics benchmark: {count} session logs")
+        for label in ("cold", "warm"):
+            started = time.perf_counter()
+            records, parsed = scan_sessions(dirs, cache_path)
+            metrics = {name: project_metrics(rows) for name, rows in records.items()}
+            elapsed = time.perf_counter() - started
+            sessions = sum(m["sessions"] for m in metrics.values())
+            print(f"  {label}: {elapsed:8.3f}s  parsed={parsed}  sessions={sessions}")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report session cycle time, WIP, and throughput per project.")
+    parser.add_argument("--project", help="Only report this project folder")
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        metavar="SESSIONS",
+        help="Benchmark cold and cached scans over this many synthetic session logs and exit",
+    )
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        return run_benchmark(args.benchmark)
+
+    dirs = [path for path in sorted(PROJECTS_DIR.iterdir()) if path.is_dir()]
+    if args.project:
+        dirs = [path for path in dirs if path.name == args.project]
+        if not dirs:
+            print(f"Project folder not found: {PROJECTS_DIR / args.project}")
+            return 1
+    for name, metrics in collect_metrics(dirs).items():
+        print(f"{name}:")
+        for line in render_metrics_lines(metrics)[1:]:
+            print(f"  {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Date-sharded session log store with a task index.
+
+New logs go to `projects/<project>/sessions/YYYY-MM-DD/` as
+`YYYYMMDD-HHMMSS-NNNN-<label>.md`, where `NNNN` is the day's next sequence
+number. Each day's counter lives in `sessions/.seq/<date>`, so an ID is
+allocated with one read and one write under an flock on `sessions/.lock`
+instead of probing the directory. The shard is only listed when its mtime
+is newer than the counter (logs added by something else, or no counter
+yet), and the file is opened exclusively, so a stale counter can never
+overwrite a log.
+
+`sessions/index.jsonl` gets one line per session: its ID (`YYYYMMDD-NNNN`,
+or the file stem for older flat logs), path, date, and task IDs. Creating a
+session appends a line; readers load it into task and date lookups instead
+of listing directories, and never write it. Logs added, copied, or removed
+by hand bump the mtime of `sessions/` or their shard past the index's; the
+next `create_session` notices and rebuilds it from the files, and `reindex`
+does the same on demand.
+
+Usage:
+    python session_store.py reindex [--project NAME]
+    python session_store.py list --project NAME [--task ID] [--date YYYY-MM-DD]
+    python session_store.py bench SESSIONS
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import AGENTS_DIR, ensure_dir, file_lock, track_path, write_md, write_text_atomic
+
+PROJECTS_DIR = AGENTS_DIR / "projects"
+INDEX_NAME = "index.jsonl"
+SEQ_DIR = ".seq"
+SKIPPED_NAMES = {"README.md", "session-template.md"}
+
+SHARD_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+STORE_NAME_PATTERN = re.compile(r"^(\d{8})-\d{6}-(\d{4})-")
+FILENAME_DATES = (
+    re.compile(r"^(\d{4})(\d{2})(\d{2})-\d{6}"),
+    re.compile(r"^(\d{4})-(\d{2})-(\d{2})T"),
+)
+TASK_ID_PATTERN = re.compile(r"\b([A-Z]{2,}-\d+)\b")
+# Lines whose task IDs belong to the session (heading and task fields of both log layouts)
+TASK_LINE_PATTERN = re.compile(r"^(?:#\s+Session Log|(?:[-*]\s*)?\*\*(?:Task ID|Associated Tasks / Issues))")
+LABEL_PATTERN = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def sessions_dir(project_dir: Path) -> Path:
+    return project_dir / "sessions"
+
+
+def index_path(project_dir: Path) -> Path:
+    return sessions_dir(project_dir) / INDEX_NAME
+
+
+def lock_path(project_dir: Path) -> Path:
+    return sessions_dir(project_dir) / ".lock"
+
+
+def seq_path(project_dir: Path, date: str) -> Path:
+    return sessions_dir(project_dir) / SEQ_DIR / date
+
+
+def session_id(name: str) -> str:
+    """`YYYYMMDD-NNNN` for store-assigned names, the stem for anything older."""
+    match = STORE_NAME_PATTERN.match(name)
+    return f"{match.group(1)}-{match.group(2)}" if match else Path(name).stem
+
+
+def _session_date(rel: Path) -> Optional[str]:
+    if len(rel.parts) > 1 and SHARD_PATTERN.match(rel.parts[0]):
+        return rel.parts[0]
+    for pattern in FILENAME_DATES:
+        match = pattern.match(rel.name)
+        if match:
+            return "-".join(match.groups())
+    return None
+
+
+def scan_task_ids(path: Path) -> List[str]:
+    """Task IDs named in a log's heading/task fields, falling back to its filename."""
+    found: List[str] = []
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if TASK_LINE_PATTERN.match(line.strip()):
+                found.extend(TASK_ID_PATTERN.findall(line))
+    if not found:
+        found = TASK_ID_PATTERN.findall(path.stem)
+    return list(dict.fromkeys(found))
+
+
+def _empty_index() -> Dict:
+    return {"sessions": {}, "tasks": {}}
+
+
+def _record(sid: str, rel: Path, date: Optional[str], tasks: Iterable[str]) -> Dict:
+    return {"id": sid, "path": rel.as_posix(), "date": date, "tasks": list(tasks)}
+
+
+def _record_line(record: Dict) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _add_record(index: Dict, record: Dict) -> None:
+    sid = record["id"]
+    index["sessions"][sid] = record
+    for task_id in record["tasks"]:
+        sessions = index["tasks"].setdefault(task_id, [])
+        if sid not in sessions:
+            sessions.append(sid)
+
+
+def _log_files(root: Path) -> Iterable[Path]:
+    """Session logs in the flat legacy layout and in date shards."""
+    try:
+        entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False) and SHARD_PATTERN.match(entry.name):
+            yield from _log_files(Path(entry.path))
+        elif (
+            entry.name.endswith(".md")
+            and entry.name not in SKIPPED_NAMES
+            and not entry.name.endswith("-prompt.md")
+            and entry.is_file(follow_symlinks=False)
+        ):
+            yield Path(entry.path)
+
+
+def _scan_records(project_dir: Path) -> Iterable[Dict]:
+    """Index records for the files under `sessions/`."""
+    root = sessions_dir(project_dir)
+    for path in _log_files(root):
+        rel = path.relative_to(root)
+        yield _record(session_id(path.name), rel, _session_date(rel), scan_task_ids(path))
+
+
+def _rebuild(project_dir: Path) -> None:
+    """Rewrite `index.jsonl` from the files under `sessions/`; call with the lock held."""
+    write_text_atomic(index_path(project_dir), "".join(map(_record_line, _scan_records(project_dir))))
+    _mark_fresh(project_dir)
+
+
+def _dir_mtime(project_dir: Path) -> int:
+    """Newest mtime of `sessions/` and its shards; it moves whenever a log is added, renamed, or removed."""
+    root = sessions_dir(project_dir)
+    newest = root.stat().st_mtime_ns
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if SHARD_PATTERN.match(entry.name) and entry.is_dir(follow_symlinks=False):
+                newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+    return newest
+
+
+def _mark_fresh(project_dir: Path) -> None:
+    """
+    Date the index just past the directories after the store's own writes. Call with the lock held.
+
+    Timestamps are coarse, so a log written in the same tick as the index
+    would otherwise tie with it and read as stale on every load.
+    """
+    path = index_path(project_dir)
+    stamp = max(path.stat().st_mtime_ns, _dir_mtime(project_dir) + 1)
+    os.utime(path, ns=(stamp, stamp))
+    track_path(path)
+
+
+def index_stale(project_dir: Path) -> bool:
+    """True when the index is missing or a log was added or removed by something other than the store."""
+    try:
+        return _dir_mtime(project_dir) >= index_path(project_dir).stat().st_mtime_ns
+    except OSError:
+        return True
+
+
+def reindex(project_dir: Path) -> Dict:
+    with file_lock(lock_path(project_dir)):
+        _rebuild(project_dir)
+    return load_index(project_dir)
+
+
+def load_index(project_dir: Path) -> Dict:
+    """
+    Session and task lookups from `index.jsonl`, read as is.
+
+    Never lists shards or writes: hand-added logs show up once a writer or
+    `reindex` has refreshed the index. Without an index file the logs are
+    scanned in memory.
+    """
+    index = _empty_index()
+    try:
+        handle = index_path(project_dir).open(encoding="utf-8")
+    except FileNotFoundError:
+        if sessions_dir(project_dir).is_dir():
+            for record in _scan_records(project_dir):
+                _add_record(index, record)
+        return index
+    with handle:
+        for line in handle:
+            if line.endswith("\n"):
+                _add_record(index, json.loads(line))
+    return index
+
+
+def _next_seq(shard: Path, counter: Path) -> int:
+    """The shard's next sequence number, recounted from its file names when the counter is stale."""
+    try:
+        if counter.stat().st_mtime_ns >= shard.stat().st_mtime_ns:
+            return int(counter.read_text(encoding="utf-8")) + 1
+    except (OSError, ValueError):
+        pass
+    seqs = [int(match.group(2)) for match in map(STORE_NAME_PATTERN.match, os.listdir(shard)) if match]
+    return max(seqs, default=0) + 1
+
+
+def create_session(
+    project_dir: Path,
+    content: str,
+    tasks: Iterable[str] = (),
+    label: Optional[str] = None,
+    when: Optional[_dt.datetime] = None,
+) -> Tuple[str, Path]:
+    """Write a new session log into today's shard and index it; returns (session ID, path)."""
+    tasks = list(tasks)
+    when = when or _dt.datetime.now()
+    date = when.strftime("%Y-%m-%d")
+    label = LABEL_PATTERN.sub("-", label or (tasks[0] if tasks else "session")).strip("-") or "session"
+    root = sessions_dir(project_dir)
+
+    with file_lock(lock_path(project_dir)):
+        # Check before touching the shard: the append below would hide hand-added logs.
+        if index_stale(project_dir):
+            _rebuild(project_dir)
+        shard = ensure_dir(root / date)
+        counter = seq_path(project_dir, date)
+        seq = _next_seq(shard, counter)
+        while True:
+            path = shard / f"{when:%Y%m%d-%H%M%S}-{seq:04d}-{label}.md"
+            try:
+                path.open("x").close()  # reserve the name; never overwrite an existing log
+                break
+            except FileExistsError:
+                seq += 1  # counter behind the files (e.g. a restored shard); take the next one
+        write_md(path, content)
+        write_text_atomic(counter, f"{seq}\n")
+        sid = session_id(path.name)
+        with index_path(project_dir).open("a", encoding="utf-8") as handle:
+            handle.write(_record_line(_record(sid, path.relative_to(root), date, tasks)))
+        _mark_fresh(project_dir)
+    return sid, path
+
+
+def session_paths(project_dir: Path, index: Optional[Dict] = None) -> List[Path]:
+    """Every indexed log, oldest shard first."""
+    index = index or load_index(project_dir)
+    root = sessions_dir(project_dir)
+    return [root / record["path"] for _, record in sorted(index["sessions"].items(), key=lambda item: item[1]["path"])]
+
+
+def sessions_for_task(project_dir: Path, task_id: str) -> List[Path]:
+    index = load_index(project_dir)
+    root = sessions_dir(project_dir)
+    return [root / index["sessions"][sid]["path"] for sid in index["tasks"].get(task_id, [])]
+
+
+def sessions_on(project_dir: Path, date: str) -> List[Path]:
+    index = load_index(project_dir)
+    root = sessions_dir(project_dir)
+    return [root / record["path"] for record in index["sessions"].values() if record["date"] == date]
+
+
+def run_benchmark(count: int) -> int:
+    """Allocate `count` names in one minute: directory probing vs the indexed counter."""
+    when = _dt.datetime(2025, 11, 15, 9, 30)
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = ensure_dir(Path(tmp) / "flat" / "sessions")
+        started = time.perf_counter()
+        probes = 0
+        for _ in range(count):
+            filename = f"{when:%Y-%m-%dT%H-%M}-session.md"
+            target = flat / filename
+            counter = 1
+            while target.exists():
+                probes += 1
+                target = flat / f"{filename}-{counter}"
+                counter += 1
+            target.write_text("log\n", encoding="utf-8")
+        probe_elapsed = time.perf_counter() - started
+
+        project_dir = Path(tmp) / "store"
+        started = time.perf_counter()
+        for n in range(count):
+            create_session(project_dir, "log\n", [f"BEN-{n % 50}"], when=when)
+        store_elapsed = time.perf_counter() - started
+        index = load_index(project_dir)
+
+    print(f"Session store benchmark: {count} session(s) started in the same minute")
+    print(f"  probe loop:    {probe_elapsed:7.3f}s  exists() probes={probes}")
+    print(f"  indexed store: {store_elapsed:7.3f}s  sessions={len(index['sessions'])}  tasks={len(index['tasks'])}")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the date-sharded session store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    reindex_cmd = sub.add_parser("reindex", help="Rebuild sessions/index.jsonl from the log files")
+    reindex_cmd.add_argument("--project", help="Only this project folder")
+    list_cmd = sub.add_parser("list", help="List indexed sessions")
+    list_cmd.add_argument("--project", required=True, help="Project folder name under agents/projects/")
+    list_cmd.add_argument("--task", help="Only sessions for this task ID")
+    list_cmd.add_argument("--date", help="Only sessions on this date (YYYY-MM-DD)")
+    bench = sub.add_parser("bench", help="Compare directory probing with indexed allocation")
+    bench.add_argument("sessions", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        return run_benchmark(args.sessions)
+
+    project_dirs = [path for path in sorted(PROJECTS_DIR.iterdir()) if path.is_dir()]
+    if args.project:
+        project_dirs = [path for path in project_dirs if path.name == args.project]
+        if not project_dirs:
+            print(f"Project folder not found: {PROJECTS_DIR / args.project}")
+            return 1
+
+    if args.command == "reindex":
+        for project_dir in project_dirs:
+            if sessions_dir(project_dir).is_dir():
+                index = reindex(project_dir)
+                print(f"✅ {project_dir.name}: indexed {len(index['sessions'])} session(s), {len(index['tasks'])} task(s)")
+        return 0
+
+    project_dir = project_dirs[0]
+    if args.task:
+        paths = sessions_for_task(project_dir, args.task)
+    elif args.date:
+        paths = sessions_on(project_dir, args.date)
+    else:
+        paths = session_paths(project_dir)
+    for path in paths:
+        print(path.relative_to(AGENTS_DIR.parent))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,20 +4,40 @@ Sync agentship-x-htdi with HTDI Agentic Lab
 Bidirectional sync of agent profiles, registry, and diary entries
 """
 
+import argparse
+import hashlib
 import json
 import os
+import re
 import sys
-from datetime import datetime
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import requests
 import shutil
 
+import lab_registry
+from lab_notify import LabNotifier
+from utils import CACHE_DIR, load_json_cache, save_json_cache, write_text_atomic
+
 # Resolve paths
 REPO_ROOT = Path(__file__).resolve().parents[2]
 CONFIG_PATH = REPO_ROOT / ".htdi-lab.config.json"
 PROFILES_DIR = REPO_ROOT / "agentship-x-htdi" / "profiles"
 OPENTASKS_PATH = REPO_ROOT / "agentship-x-htdi" / "OPENTASKS.md"
+PROFILE_CACHE = CACHE_DIR / "profiles.json"
+PROFILE_CACHE_VERSION = 1
+# Below this many changed profiles a process pool costs more than it saves
+PARALLEL_PARSE_MIN = 64
+# Last-seen change-feed position per registry
+FEED_CURSOR = CACHE_DIR / "lab_feed.json"
+FEED_CURSOR_VERSION = 1
+# File stems a pulled change may write; anything else could point outside PROFILES_DIR
+SAFE_PROFILE_STEM = re.compile(r"[A-Za-z0-9_-]+")
+# Registry agent fields that map back onto local profile fields
+PULLED_FIELDS = ("name", "role", "category", "provider", "model3D", "favoriteColor")
 
 
 def load_config() -> Dict:
@@ -42,51 +62,142 @@ def load_registry(registry_path: Path) -> Dict:
 
 
 def save_registry(registry: Dict, registry_path: Path) -> None:
-    """Save the central agent registry"""
-    registry["generatedAt"] = datetime.utcnow().isoformat() + "Z"
-
-    with open(registry_path, "w") as f:
-        json.dump(registry, f, indent=2)
+    """Save the central agent registry atomically (temp file + rename)"""
+    lab_registry.write_registry(registry, registry_path)
 
     print(f"✅ Registry saved to {registry_path}")
 
 
-def scan_local_agents() -> List[Dict]:
-    """Scan local profiles directory for agent JSON files"""
-    agents = []
+def profile_to_agent(profile: Dict, json_file: Path) -> Dict:
+    """Extract the registry summary for one profile"""
+    return {
+        "alias": f"agent.{profile.get('agentId', json_file.stem)}",
+        "name": profile.get("name", json_file.stem),
+        "role": profile.get("role", "Builder"),
+        "category": profile.get("category", "worker"),
+        "status": "active",
+        "promptPath": f"agentship-x-htdi/profiles/{json_file.name}",
+        "description": profile.get("bio", profile.get("quote", "No description"))[:200],
+        "provider": profile.get("provider", "Unknown"),
+        "model3D": profile.get("model3D"),
+        "favoriteColor": profile.get("favoriteColor")
+    }
+
+
+def parse_profile(path: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """Parse one profile file into (agent, error); runs in pool workers"""
+    json_file = Path(path)
+    try:
+        with open(json_file, "r") as f:
+            return profile_to_agent(json.load(f), json_file), None
+    except Exception as e:
+        return None, str(e)
+
+
+def scan_local_agents(
+    profiles_dir: Path = PROFILES_DIR,
+    cache_path: Path = PROFILE_CACHE,
+    quiet: bool = False,
+) -> List[Dict]:
+    """
+    Scan local profiles directory for agent JSON files
+
+    Summaries are cached by (mtime, size); only changed files are parsed,
+    in parallel when there are many. Parse errors are reported once at the end.
+    """
+    if not profiles_dir.exists():
+        return []
+
+    cache = load_json_cache(cache_path, PROFILE_CACHE_VERSION).get("files", {})
+    entries: List[Tuple[str, str, List[int]]] = []
+    with os.scandir(profiles_dir) as listing:
+        for entry in listing:
+            if entry.name.endswith(".json") and entry.name != "TEMPLATE.json" and entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, entry.path, [stat.st_mtime_ns, stat.st_size]))
+    entries.sort()
+
+    results: Dict[str, List] = {}
+    stale = []
+    for name, path, stamp in entries:
+        cached = cache.get(name)
+        if cached and cached[0] == stamp:
+            results[name] = cached
+        else:
+            stale.append((name, path, stamp))
+
+    paths = [path for _, path, _ in stale]
+    if len(stale) >= PARALLEL_PARSE_MIN:
+        with ProcessPoolExecutor() as pool:
+            parsed = list(pool.map(parse_profile, paths, chunksize=max(1, len(paths) // (os.cpu_count() or 1) // 4)))
+    else:
+        parsed = [parse_profile(path) for path in paths]
+    for (name, _, stamp), (agent, error) in zip(stale, parsed):
+        results[name] = [stamp, agent, error]
+
+    if stale or len(results) != len(cache):
+        save_json_cache(cache_path, {"files": results}, PROFILE_CACHE_VERSION)
+
+    agents = [results[name][1] for name, _, _ in entries if results[name][1] is not None]
+    errors = [(name, results[name][2]) for name, _, _ in entries if results[name][2]]
+    if not quiet:
+        print(f"  📋 Found {len(agents)} agent(s) ({len(stale)} parsed, {len(entries) - len(stale)} cached)")
+        if errors:
+            print(f"  ⚠️  Failed to parse {len(errors)} profile(s):")
+            for name, error in errors:
+                print(f"     - {name}: {error}")
+    return agents
+
+
+def run_scan_benchmark(count: int) -> int:
+    """Time cold and cached profile scans over synthetic profiles"""
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles_dir = Path(tmp) / "profiles"
+        profiles_dir.mkdir()
+        for idx in range(count):
+            profile = {"agentId": f"bench-{idx}", "name": f"Bench {idx}", "bio": "Synthetic profile " * 20,
+                       "skills": [f"skill-{n}" for n in range(50)]}
+            (profiles_dir / f"bench-{idx:05d}.json").write_text(json.dumps(profile))
+        (profiles_dir / "broken.json").write_text("{not json")
+        cache_path = Path(tmp) / "profiles-cache.json"
 
-    if not PROFILES_DIR.exists():
-        return agents
+        print(f"📊 Profile scan benchmark: {count} profile(s)")
+        for label in ("cold", "warm"):
+            started = time.perf_counter()
+            agents = scan_local_agents(profiles_dir, cache_path, quiet=True)
+            elapsed = time.perf_counter() - started
+            print(f"  {label}: {elapsed:7.3f}s  agents={len(agents)}")
+    return 0
 
-    for json_file in PROFILES_DIR.glob("*.json"):
-        if json_file.name == "TEMPLATE.json":
-            continue
 
-        try:
-            with open(json_file, "r") as f:
-                profile = json.load(f)
+def agent_hash(agent: Dict) -> str:
+    """Stable content hash of one agent record"""
+    encoded = json.dumps(agent, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
 
-            # Extract relevant info
-            agent = {
-                "alias": f"agent.{profile.get('agentId', json_file.stem)}",
-                "name": profile.get("name", json_file.stem),
-                "role": profile.get("role", "Builder"),
-                "category": profile.get("category", "worker"),
-                "status": "active",
-                "promptPath": f"agentship-x-htdi/profiles/{json_file.name}",
-                "description": profile.get("bio", profile.get("quote", "No description"))[:200],
-                "provider": profile.get("provider", "Unknown"),
-                "model3D": profile.get("model3D"),
-                "favoriteColor": profile.get("favoriteColor")
-            }
 
-            agents.append(agent)
-            print(f"  📋 Found agent: {agent['name']} ({agent['alias']})")
+def diff_agents(existing: List[Dict], local: List[Dict]) -> Dict[str, List[str]]:
+    """Compare registry agents with local ones by alias and content hash"""
+    before = {agent.get("alias"): agent_hash(agent) for agent in existing}
+    after = {agent["alias"]: agent_hash(agent) for agent in local}
+    return {
+        "added": [alias for alias in after if alias not in before],
+        "updated": [alias for alias, digest in after.items() if alias in before and before[alias] != digest],
+        "removed": [alias for alias in before if alias not in after],
+    }
 
-        except Exception as e:
-            print(f"  ⚠️  Failed to parse {json_file.name}: {e}")
 
-    return agents
+def registry_sharded(config: Dict) -> bool:
+    """True when the lab stores one shard per house (see lab_registry.py)"""
+    return config["lab"].get("registryLayout") == "sharded"
+
+
+def find_registry_house(config: Dict) -> Optional[Dict]:
+    """This house's registry entry in either layout"""
+    registry_path = Path(config["lab"]["registryPath"])
+    if registry_sharded(config):
+        return lab_registry.load_house(registry_path, config["house"]["id"])
+    return lab_registry.find_house(load_registry(registry_path), config["house"]["id"])
 
 
 def sync_to_registry(config: Dict) -> None:
@@ -94,7 +205,9 @@ def sync_to_registry(config: Dict) -> None:
     print("\n🔄 Syncing to central registry...")
 
     registry_path = Path(config["lab"]["registryPath"])
-    registry = load_registry(registry_path)
+    sharded = registry_sharded(config)
+    if not sharded and not registry_path.exists():
+        print(f"⚠️  Registry not found: {registry_path}")
 
     # Scan local agents
     local_agents = scan_local_agents()
@@ -103,59 +216,171 @@ def sync_to_registry(config: Dict) -> None:
         print("  ℹ️  No local agents found to sync")
         return
 
-    # Find or create house entry
     house_id = config["house"]["id"]
-    house_entry = None
-
-    for house in registry.get("houses", []):
-        if house["id"] == house_id:
-            house_entry = house
-            break
-
-    if house_entry is None:
-        # Create new house entry
-        house_entry = {
-            "id": house_id,
-            "name": config["house"]["name"],
-            "type": config["house"]["type"],
-            "agents": []
-        }
-        if "houses" not in registry:
-            registry["houses"] = []
-        registry["houses"].append(house_entry)
+    outcome: Dict = {}
+
+    def apply_agents(house_entry: Dict) -> bool:
+        """Re-runnable against a fresh house entry if another writer got there first"""
+        outcome["created"] = not house_entry
+        if not house_entry:
+            house_entry.update({
+                "id": house_id,
+                "name": config["house"]["name"],
+                "type": config["house"]["type"],
+                "agents": []
+            })
+
+        # Only rewrite the registry when an agent record actually changed
+        existing = house_entry.get("agents", [])
+        outcome["delta"] = diff_agents(existing, local_agents)
+        reordered = [a.get("alias") for a in existing] != [a["alias"] for a in local_agents]
+        if not any(outcome["delta"].values()) and not reordered:
+            return False
+        house_entry["agents"] = local_agents
+        return True
+
+    def apply_to_registry(registry: Dict) -> bool:
+        house_entry = lab_registry.find_house(registry, house_id)
+        if house_entry is None:
+            house_entry = {}
+            registry.setdefault("houses", []).append(house_entry)
+        return apply_agents(house_entry)
+
+    if sharded:
+        # Touches only this house's shard and its index line
+        _, changed = lab_registry.update_house(registry_path, house_id, apply_agents)
+        target = lab_registry.house_path(registry_path, house_id)
+    else:
+        _, changed = lab_registry.update_registry(registry_path, apply_to_registry)
+        target = registry_path
+    if outcome["created"]:
         print(f"  ✨ Created new house entry: {house_id}")
+    if not changed:
+        print(f"  ✅ Registry already up to date ({len(local_agents)} agent(s))")
+        return
 
-    # Update agents
-    house_entry["agents"] = local_agents
-
-    # Save registry
-    save_registry(registry, registry_path)
-
-    print(f"  ✅ Synced {len(local_agents)} agent(s) to registry")
-
-
-def sync_from_registry(config: Dict) -> None:
-    """Pull updates from central registry (if needed)"""
+    delta = outcome["delta"]
+    by_alias = {agent["alias"]: agent for agent in local_agents}
+    changes = [
+        {"house": house_id, "alias": alias, "op": "upsert", "agent": by_alias[alias]}
+        for alias in delta["added"] + delta["updated"]
+    ] + [{"house": house_id, "alias": alias, "op": "delete", "agent": None} for alias in delta["removed"]]
+    lab_registry.publish_changes(registry_path, changes, house_id)
+    print(f"✅ Registry saved to {target}")
+    print(
+        f"  ✅ Synced {len(local_agents)} agent(s) to registry: "
+        f"{len(delta['added'])} added, {len(delta['updated'])} updated, {len(delta['removed'])} removed"
+    )
+
+
+def find_local_profile(agent: Dict, alias: str, profiles_dir: Path) -> Optional[Path]:
+    """
+    Local profile path for a registry agent (promptPath first, then agentId)
+
+    Both come from the shared feed, so only plain file names are accepted;
+    returns None when neither is one.
+    """
+    prompt_path = agent.get("promptPath") if agent else None
+    if prompt_path:
+        name = Path(prompt_path).name
+        if name.endswith(".json") and SAFE_PROFILE_STEM.fullmatch(name[: -len(".json")]):
+            candidate = profiles_dir / name
+            if candidate.is_file():
+                return candidate
+    stem = alias.split(".", 1)[-1]
+    if not SAFE_PROFILE_STEM.fullmatch(stem):
+        return None
+    return profiles_dir / f"{stem}.json"
+
+
+def apply_pulled_agent(change: Dict, profiles_dir: Path) -> Optional[str]:
+    """Apply one pulled change to its local profile; returns a description when something changed"""
+    alias = change["alias"]
+    agent = change.get("agent")
+    profile_path = find_local_profile(agent, alias, profiles_dir)
+    if profile_path is None:
+        print(f"  ⚠️  Skipping {alias!r}: not a valid profile name")
+        return None
+    if change["op"] == "delete":
+        if profile_path.exists():
+            print(f"  ⚠️  {alias} was removed in the lab; keeping {profile_path.name}")
+        return None
+
+    created = not profile_path.exists()
+    profile = {"agentId": profile_path.stem} if created else json.loads(profile_path.read_text(encoding="utf-8"))
+    # Compare with what the profile would publish, so registry defaults aren't copied in
+    current = profile_to_agent(profile, profile_path)
+    updated = [
+        field for field in PULLED_FIELDS
+        if agent.get(field) is not None and current.get(field) != agent[field]
+    ]
+    if not updated and not created:
+        return None
+    for field in updated:
+        profile[field] = agent[field]
+    write_text_atomic(profile_path, json.dumps(profile, indent=2, ensure_ascii=False) + "\n")
+    return f"created {profile_path.name}" if created else f"{profile_path.name}: {', '.join(updated)}"
+
+
+def sync_from_registry(
+    config: Dict,
+    profiles_dir: Path = PROFILES_DIR,
+    cursor_path: Path = FEED_CURSOR,
+) -> None:
+    """
+    Pull agent changes made in the lab since the last sync
+
+    Skips the feed entirely when the house's head in `heads.json` is not
+    past the stored cursor. Otherwise reads only the change-feed records
+    after the cursor, keeps the latest change per agent of this house
+    (skipping ones this house published) and applies them to local profiles.
+    """
     print("\n🔽 Checking for registry updates...")
 
     registry_path = Path(config["lab"]["registryPath"])
-    registry = load_registry(registry_path)
-
     house_id = config["house"]["id"]
-
-    for house in registry.get("houses", []):
-        if house["id"] == house_id:
-            print(f"  ℹ️  Found house entry with {len(house.get('agents', []))} agent(s)")
-            return
-
-    print("  ℹ️  House not yet registered in central lab")
+    cursors = load_json_cache(cursor_path, FEED_CURSOR_VERSION).get("cursors", {})
+    cursor = cursors.get(str(registry_path), {"revision": 0, "offset": 0})
+
+    house_head = lab_registry.load_heads(registry_path)["houses"].get(house_id, 0)
+    if house_head > cursor["revision"]:
+        records, offset = lab_registry.read_feed(registry_path, cursor["revision"], cursor["offset"])
+    else:
+        records, offset = [], cursor["offset"]
+    latest: Dict[str, Dict] = {}
+    for record in records:
+        if record["house"] == house_id and record["origin"] != house_id:
+            latest[record["alias"]] = record
+    applied = [note for note in (apply_pulled_agent(change, profiles_dir) for change in latest.values()) if note]
+    for note in applied:
+        print(f"  ✏️  {note}")
+
+    revision = max([cursor["revision"]] + [record["rev"] for record in records])
+    if revision != cursor["revision"] or offset != cursor["offset"]:
+        cursors[str(registry_path)] = {"revision": revision, "offset": offset}
+        save_json_cache(cursor_path, {"cursors": cursors}, FEED_CURSOR_VERSION)
+
+    if records:
+        print(
+            f"  ✅ Pulled {len(records)} change(s) up to revision {revision}: "
+            f"{len(latest)} for this house, {len(applied)} applied to local profiles"
+        )
+    elif find_registry_house(config) is None:
+        print("  ℹ️  House not yet registered in central lab")
+    else:
+        print(f"  ✅ No registry changes since revision {revision}")
 
 
-def notify_lab_api(config: Dict, action: str) -> None:
-    """Notify the lab API of sync completion"""
+def notify_lab_api(config: Dict, action: str, notifier: Optional[LabNotifier] = None) -> None:
+    """Notify the lab API of sync completion (queued when a notifier is given)"""
     if not config["lab"]["enabled"]:
         return
 
+    message = f"Sync completed for {config['house']['name']}: {action}"
+    if notifier is not None:
+        notifier.notify(message)
+        return
+
     api_url = config["lab"]["apiUrl"]
 
     try:
@@ -163,7 +388,7 @@ def notify_lab_api(config: Dict, action: str) -> None:
             f"{api_url}/api/run-command",
             json={
                 "command": "echo",
-                "args": [f"Sync completed for {config['house']['name']}: {action}"]
+                "args": [message]
             },
             timeout=5
         )
@@ -177,8 +402,34 @@ def notify_lab_api(config: Dict, action: str) -> None:
         print(f"  ⚠️  Lab API not reachable (this is OK if not running): {e}")
 
 
+def report_notifier(notifier: LabNotifier) -> None:
+    """Flush queued notifications and summarize delivery"""
+    flushed = notifier.close(timeout=5.0)
+    stats = notifier.stats
+    if stats["sent"]:
+        print(f"  ✅ Notified lab API: {stats['sent']} message(s) in {stats['batches']} batch(es)")
+    reason = f": {notifier.last_error}" if notifier.last_error else ""
+    if not flushed:
+        unsent = stats["queued"] - stats["sent"] - stats["failed"]
+        print(f"  ⚠️  Lab API did not answer within 5s, {unsent} message(s) not sent{reason}")
+    elif stats["failed"]:
+        print(f"  ⚠️  Lab API not reachable (this is OK if not running){reason}")
+
+
 def main():
     """Main sync routine"""
+    parser = argparse.ArgumentParser(description="Sync agent profiles with the HTDI lab registry.")
+    parser.add_argument(
+        "--benchmark-scan",
+        type=int,
+        metavar="PROFILES",
+        help="Benchmark cold and cached profile scans over synthetic profiles and exit",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark_scan:
+        sys.exit(run_scan_benchmark(args.benchmark_scan))
+
     print("🚀 HTDI Lab Sync - agentship-x-htdi")
     print("=" * 60)
 
@@ -192,12 +443,16 @@ def main():
     print(f"🔗 Lab API: {config['lab']['apiUrl']}")
     print(f"📚 Registry: {config['lab']['registryPath']}")
 
-    # Sync operations
-    sync_to_registry(config)
+    # Notifications are queued and sent in the background while syncing
+    notifier = LabNotifier(config["lab"]["apiUrl"])
+
+    # Pull lab edits first so the push below doesn't overwrite them
     sync_from_registry(config)
+    sync_to_registry(config)
 
     # Notify lab
-    notify_lab_api(config, "bidirectional-sync")
+    notify_lab_api(config, "bidirectional-sync", notifier)
+    report_notifier(notifier)
 
     print("\n✅ Sync complete!")
     print("=" * 60)
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite task ledger.
+
+Holds tasks, dependencies, and status history for every project, with
+indexes on status, priority, and project. The markdown files stay the
+human-facing view: `import` loads `projects/*/tasks.md` into the ledger and
+`export` writes status changes back into the seven-column tables and
+re-renders OPENTASKS.md. Section-based ledgers (`## Backlog`, `## Done`, …)
+take their status from the section a row sits in, so status changes to them
+are not written back; `set-status` and `export` warn about each such row.
+
+Usage:
+    python task_ledger.py import
+    python task_ledger.py query --project webgpu-battle-royale --available
+    python task_ledger.py set-status --project webgpu-battle-royale --task WBR-001 --status completed
+    python task_ledger.py export
+    python task_ledger.py bench --tasks 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from task_store import parse_project_tasks
+from utils import AGENTS_DIR, parse_markdown_table, project_display_name, read_md, section_lines, write_md
+
+LEDGER_PATH = Path(os.environ.get("AGENT_TASK_LEDGER", AGENTS_DIR / "tasks.sqlite3"))
+PROJECTS_DIR = AGENTS_DIR / "projects"
+PRIORITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+SECTIONS = ("Backlog", "In Progress", "Review / QA", "Done")
+OPEN_SECTIONS = ("Backlog", "In Progress")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    project TEXT NOT NULL,
+    id TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT '',
+    priority_rank INTEGER NOT NULL DEFAULT 99,
+    status TEXT NOT NULL DEFAULT '',
+    section TEXT,
+    estimate TEXT NOT NULL DEFAULT '',
+    owner TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    position INTEGER NOT NULL,
+    PRIMARY KEY (project, id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority_rank);
+CREATE INDEX IF NOT EXISTS idx_tasks_pick ON tasks (project, status, priority_rank, position);
+CREATE TABLE IF NOT EXISTS dependencies (
+    project TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    depends_on TEXT NOT NULL,
+    PRIMARY KEY (project, task_id, depends_on)
+);
+CREATE INDEX IF NOT EXISTS idx_dependencies_target ON dependencies (project, depends_on);
+CREATE TABLE IF NOT EXISTS status_history (
+    project TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT NOT NULL,
+    changed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_task ON status_history (project, task_id);
+"""
+
+AVAILABLE_SQL = """
+SELECT * FROM tasks AS t
+WHERE t.project = ? AND t.status IN ('ready', 'backlog')
+  AND NOT EXISTS (
+    SELECT 1 FROM dependencies AS d
+    LEFT JOIN tasks AS u ON u.project = d.project AND u.id = d.depends_on
+    WHERE d.project = t.project AND d.task_id = t.id
+      AND (u.status IS NULL OR u.status != 'completed')
+  )
+ORDER BY t.priority_rank, t.position
+"""
+
+
+def connect(path: Path | str = LEDGER_PATH) -> sqlite3.Connection:
+    """Open the ledger, creating the schema if needed."""
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _now() -> str:
+    return _dt.datetime.now().isoformat(timespec="seconds")
+
+
+def read_project_markdown(project_dir: Path) -> List[Dict]:
+    """
+    Parse a project's tasks.md into ledger rows.
+
+    Ledgers laid out as `## Backlog` / `## In Progress` / … sections take their
+    status from the section; otherwise the seven-column tables
+    (ID | … | Status | Dependencies | Estimate) carry their own status.
+    """
+    markdown = read_md(project_dir / "tasks.md")
+    sections = {section: section_lines(markdown, section) for section in SECTIONS}
+    if not any(sections.values()):
+        return [dict(task, section=None, owner="", notes="") for task in parse_project_tasks(markdown)]
+
+    rows: List[Dict] = []
+    for section, lines in sections.items():
+        _, table = parse_markdown_table(lines)
+        for row in table:
+            if not row.get("ID"):
+                continue
+            rows.append({
+                "id": row["ID"],
+                "title": row.get("Title", ""),
+                "description": row.get("Description", ""),
+                "priority": row.get("Priority", "").lower(),
+                "status": section.lower(),
+                "section": section,
+                "dependencies": [],
+                "estimate": "",
+                "owner": row.get("Owner", ""),
+                "notes": row.get("Notes", ""),
+            })
+    return rows
+
+
+def import_project(conn: sqlite3.Connection, project_dir: Path) -> int:
+    """Replace a project's rows with the contents of its tasks.md, logging status changes."""
+    project = project_dir.name
+    project_name = project_display_name(project_dir)
+    rows = read_project_markdown(project_dir)
+    previous = {
+        row["id"]: row["status"]
+        for row in conn.execute("SELECT id, status FROM tasks WHERE project = ?", (project,))
+    }
+    changed_at = _now()
+    with conn:
+        conn.execute("DELETE FROM tasks WHERE project = ?", (project,))
+        conn.execute("DELETE FROM dependencies WHERE project = ?", (project,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO tasks (project, id, project_name, title, description, priority, priority_rank,"
+            " status, section, estimate, owner, notes, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    project, row["id"], project_name, row["title"], row["description"], row["priority"],
+                    PRIORITY_RANK.get(row["priority"], 99), row["status"], row["section"], row["estimate"],
+                    row["owner"], row["notes"], position,
+                )
+                for position, row in enumerate(rows)
+            ],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO dependencies (project, task_id, depends_on) VALUES (?, ?, ?)",
+            [(project, row["id"], dep) for row in rows for dep in row["dependencies"]],
+        )
+        conn.executemany(
+            "INSERT INTO status_history (project, task_id, old_status, new_status, changed_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (project, row["id"], previous.get(row["id"]), row["status"], changed_at)
+                for row in rows
+                if previous.get(row["id"]) != row["status"]
+            ],
+        )
+    return len(rows)
+
+
+def _dependencies(conn: sqlite3.Connection, project: str, task_ids: Iterable[str]) -> Dict[str, List[str]]:
+    ids = list(task_ids)
+    deps: Dict[str, List[str]] = {task_id: [] for task_id in ids}
+    if not ids:
+        return deps
+    if len(ids) > 500:
+        # Large batches: one scan of the project's dependencies beats a huge IN list.
+        cursor = conn.execute("SELECT task_id, depends_on FROM dependencies WHERE project = ?", (project,))
+    else:
+        placeholders = ",".join("?" for _ in ids)
+        cursor = conn.execute(
+            f"SELECT task_id, depends_on FROM dependencies WHERE project = ? AND task_id IN ({placeholders})",
+            (project, *ids),
+        )
+    for row in cursor:
+        if row["task_id"] in deps:
+            deps[row["task_id"]].append(row["depends_on"])
+    return deps
+
+
+def _as_executor_tasks(conn: sqlite3.Connection, project: str, rows: List[sqlite3.Row]) -> List[Dict]:
+    deps = _dependencies(conn, project, (row["id"] for row in rows))
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "priority": row["priority"],
+            "status": row["status"],
+            "dependencies": sorted(deps[row["id"]]),
+            "estimate": row["estimate"],
+        }
+        for row in rows
+    ]
+
+
+def project_tasks(conn: sqlite3.Connection, project: str) -> List[Dict]:
+    """All tasks of a project in tasks.md order, shaped like `agent_executor.parse_tasks`."""
+    rows = conn.execute("SELECT * FROM tasks WHERE project = ? ORDER BY position", (project,)).fetchall()
+    return _as_executor_tasks(conn, project, rows)
+
+
+def available_tasks(conn: sqlite3.Connection, project: str, limit: Optional[int] = None) -> List[Dict]:
+    """Ready/backlog tasks whose dependencies are completed, highest priority first."""
+    sql = AVAILABLE_SQL + (" LIMIT ?" if limit else "")
+    params = (project, limit) if limit else (project,)
+    return _as_executor_tasks(conn, project, conn.execute(sql, params).fetchall())
+
+
+def set_status(conn: sqlite3.Connection, project: str, task_id: str, new_status: str) -> bool:
+    """Update one task's status and record the transition. Returns False when the task is unknown."""
+    row = conn.execute("SELECT status FROM tasks WHERE project = ? AND id = ?", (project, task_id)).fetchone()
+    if row is None:
+        return False
+    status = new_status.lower()
+    with conn:
+        conn.execute("UPDATE tasks SET status = ? WHERE project = ? AND id = ?", (status, project, task_id))
+        conn.execute(
+            "INSERT INTO status_history (project, task_id, old_status, new_status, changed_at) VALUES (?, ?, ?, ?, ?)",
+            (project, task_id, row["status"], status, _now()),
+        )
+    return True
+
+
+def export_project(conn: sqlite3.Connection, project_dir: Path) -> bool:
+    """
+    Write ledger statuses back into the project's seven-column tasks.md tables.
+
+    Section-based ledgers are left untouched; their status is their section.
+    Returns True when the file changed.
+    """
+    tasks_path = project_dir / "tasks.md"
+    content = read_md(tasks_path)
+    statuses = {
+        row["id"]: row["status"]
+        for row in conn.execute(
+            "SELECT id, status FROM tasks WHERE project = ? AND section IS NULL", (project_dir.name,)
+        )
+    }
+    if not statuses:
+        return False
+
+    def replace(match: re.Match) -> str:
+        status = statuses.get(match.group(2))
+        if status is None:
+            return match.group(0)
+        return f"{match.group(1)}{status.title()}{match.group(3)}"
+
+    pattern = re.compile(r"^(\|\s*([A-Z]+-\d+)\s*\|(?:[^|]*\|){3}\s*)[^|]*?(\s*\|(?:[^|]*\|){2}\s*)$", re.MULTILINE)
+    updated = pattern.sub(replace, content)
+    if updated == content:
+        return False
+    write_md(tasks_path, updated)
+    return True
+
+
+def unexported_rows(conn: sqlite3.Connection, project: Optional[str] = None) -> List[sqlite3.Row]:
+    """Section-based tasks whose ledger status no longer matches the section they sit in."""
+    sql = "SELECT project, id, status, section FROM tasks WHERE section IS NOT NULL AND status != lower(section)"
+    params: tuple = ()
+    if project is not None:
+        sql += " AND project = ?"
+        params = (project,)
+    return conn.execute(sql + " ORDER BY project, position", params).fetchall()
+
+
+def _warn_unexported(rows: Iterable[sqlite3.Row]) -> None:
+    for row in rows:
+        print(
+            f"⚠️  {row['project']}/{row['id']}: status '{row['status']}' is not written back; "
+            f"tasks.md still lists it under '## {row['section']}'. Move the row by hand."
+        )
+
+
+def open_ledger_rows(conn: sqlite3.Connection) -> List[Dict[str, str]]:
+    """Rows for OPENTASKS.md: section-based Backlog/In Progress tasks."""
+    placeholders = ",".join("?" for _ in OPEN_SECTIONS)
+    rows = conn.execute(
+        f"SELECT * FROM tasks WHERE section IN ({placeholders})", OPEN_SECTIONS
+    ).fetchall()
+    return [
+        {
+            "Project": row["project_name"],
+            "Status": row["section"],
+            "ID": row["id"],
+            "Title": row["title"],
+            "Description": row["description"],
+            "Priority": row["priority"].title(),
+            "Owner": row["owner"],
+            "Notes": row["notes"],
+        }
+        for row in rows
+    ]
+
+
+def _bench_connection(task_count: int, projects: int) -> sqlite3.Connection:
+    conn = connect(":memory:")
+    priorities = list(PRIORITY_RANK)
+    statuses = ["backlog", "ready", "completed", "in_progress"]
+    per_project = task_count // projects
+    with conn:
+        conn.executemany(
+            "INSERT INTO tasks (project, id, project_name, title, priority, priority_rank, status, position)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    f"p{n % projects}", f"T-{n}", f"Project {n % projects}", f"Task {n}",
+                    priorities[n % 4], n % 4, statuses[n % 4], n // projects,
+                )
+                for n in range(per_project * projects)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO dependencies (project, task_id, depends_on) VALUES (?, ?, ?)",
+            ((f"p{n % projects}", f"T-{n}", f"T-{n - projects}") for n in range(projects, per_project * projects)),
+        )
+    conn.execute("ANALYZE")
+    return conn
+
+
+def run_benchmark(task_count: int, projects: int = 20) -> int:
+    conn = _bench_connection(task_count, projects)
+    checks = {
+        "auto-pick (limit 1)": lambda: available_tasks(conn, "p0", limit=1),
+        "list available (limit 10)": lambda: available_tasks(conn, "p1", limit=10),
+        "lookup by id": lambda: conn.execute(
+            "SELECT * FROM tasks WHERE project = ? AND id = ?", ("p2", "T-42")
+        ).fetchone(),
+        "count by status": lambda: conn.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ).fetchall(),
+        "set status": lambda: set_status(conn, "p3", "T-3", "completed"),
+    }
+    print(f"Ledger benchmark: {task_count} tasks across {projects} projects")
+    for label, check in checks.items():
+        started = time.perf_counter()
+        check()
+        print(f"  {label:<26} {(time.perf_counter() - started) * 1000:8.2f} ms")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="SQLite-backed task ledger.")
+    parser.add_argument("--db", type=Path, default=LEDGER_PATH, help="Ledger path (env AGENT_TASK_LEDGER)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("import", help="Load projects/*/tasks.md into the ledger")
+    sub.add_parser("export", help="Write statuses back to tasks.md and re-render OPENTASKS.md")
+
+    query = sub.add_parser("query", help="List tasks for a project")
+    query.add_argument("--project", required=True)
+    query.add_argument("--available", action="store_true", help="Only tasks ready to start")
+
+    status = sub.add_parser("set-status", help="Change a task status")
+    status.add_argument("--project", required=True)
+    status.add_argument("--task", required=True)
+    status.add_argument("--status", required=True)
+
+    bench = sub.add_parser("bench", help="Time executor queries on a synthetic ledger")
+    bench.add_argument("--tasks", type=int, default=100_000)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        return run_benchmark(args.tasks)
+
+    conn = connect(args.db)
+    if args.command == "import":
+        total = 0
+        for project_dir in sorted(PROJECTS_DIR.iterdir()):
+            if project_dir.is_dir() and (project_dir / "tasks.md").exists():
+                total += import_project(conn, project_dir)
+        print(f"Imported {total} task(s) into {args.db}")
+    elif args.command == "export":
+        import collect_opentasks
+
+        for project_dir in sorted(PROJECTS_DIR.iterdir()):
+            if project_dir.is_dir() and (project_dir / "tasks.md").exists() and export_project(conn, project_dir):
+                print(f"Updated {project_dir.name}/tasks.md")
+        _warn_unexported(unexported_rows(conn))
+        rows = sorted(open_ledger_rows(conn), key=collect_opentasks.row_sort_key)
+        write_md(collect_opentasks.TARGET_FILE, collect_opentasks.render_ledger(rows))
+        print(f"Updated {collect_opentasks.TARGET_FILE.relative_to(AGENTS_DIR)}")
+    elif args.command == "query":
+        tasks = available_tasks(conn, args.project) if args.available else project_tasks(conn, args.project)
+        for task in tasks:
+            print(f"{task['id']}\t{task['status']}\t{task['priority']}\t{task['title']}")
+    elif args.command == "set-status":
+        if not set_status(conn, args.project, args.task, args.status):
+            print(f"Task {args.task} not found in {args.project}")
+            return 1
+        print(f"{args.task} → {args.status.lower()}")
+        _warn_unexported(row for row in unexported_rows(conn, args.project) if row["id"] == args.task)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Machine-readable task store written next to OPENTASKS.md.
+
+`collect_opentasks.py` emits `OPENTASKS.json` alongside the markdown ledger.
+It holds the open ledger rows (with indexes by project, status, priority and
+ID) plus each project's full task list in the shape `agent_executor` expects.
+Readers load it when the markdown sources it was built from are unchanged and
+fall back to parsing markdown otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from utils import AGENTS_DIR, file_digest, track_path, write_json_atomic
+
+STORE_FILE = AGENTS_DIR / "OPENTASKS.json"
+STORE_VERSION = 1
+LEDGER_SOURCE = "OPENTASKS.md"
+INDEXED_COLUMNS = {"project": "Project", "status": "Status", "priority": "Priority"}
+
+# Seven-column project table: ID | Title | Description | Priority | Status | Dependencies | Estimate
+TASK_ROW_PATTERN = re.compile(
+    r'\|\s*([A-Z]+-\d+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|'
+)
+
+
+def parse_project_tasks(tasks_md_content: str) -> List[Dict]:
+    """Parse executor-style task rows from a project's tasks.md."""
+    tasks = []
+    for match in TASK_ROW_PATTERN.finditer(tasks_md_content):
+        dependencies = match.group(6).strip()
+        tasks.append({
+            'id': match.group(1).strip(),
+            'title': match.group(2).strip(),
+            'description': match.group(3).strip(),
+            'priority': match.group(4).strip().lower(),
+            'status': match.group(5).strip().lower(),
+            'dependencies': [d.strip() for d in dependencies.split(',') if d.strip() and d.strip() != '-'],
+            'estimate': match.group(7).strip(),
+        })
+    return tasks
+
+
+def _source_record(path: Path) -> List:
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size, file_digest(path)]
+
+
+def _source_fresh(record: Optional[Sequence], path: Path) -> bool:
+    """Cheap stat comparison first; content hash only when the stat differs (e.g. after checkout)."""
+    if not record or not path.exists():
+        return False
+    stat = path.stat()
+    if [stat.st_mtime_ns, stat.st_size] == list(record[:2]):
+        return True
+    return stat.st_size == record[1] and file_digest(path) == record[2]
+
+
+def _build_indexes(rows: List[List[str]], columns: List[str]) -> Dict[str, Dict]:
+    indexes: Dict[str, Dict] = {key: {} for key in INDEXED_COLUMNS}
+    positions = {key: columns.index(column) for key, column in INDEXED_COLUMNS.items()}
+    id_pos = columns.index("ID")
+    by_id: Dict[str, List[int]] = {}
+    for row_idx, row in enumerate(rows):
+        for key, pos in positions.items():
+            indexes[key].setdefault(row[pos].lower(), []).append(row_idx)
+        by_id.setdefault(row[id_pos], []).append(row_idx)
+    indexes["id"] = by_id
+    return indexes
+
+
+def build_store(
+    open_rows: List[Dict[str, str]],
+    columns: List[str],
+    project_dirs: Iterable[Path],
+    previous: Optional[Dict] = None,
+) -> Dict:
+    """
+    Assemble the store payload.
+
+    Project task lists are reused from `previous` when their tasks.md is unchanged.
+    """
+    previous_projects = (previous or {}).get("projects", {})
+    previous_sources = (previous or {}).get("sources", {})
+    sources: Dict[str, List] = {}
+    projects: Dict[str, Dict] = {}
+
+    for project_dir in project_dirs:
+        tasks_path = project_dir / "tasks.md"
+        rel = str(tasks_path.relative_to(AGENTS_DIR))
+        cached = previous_projects.get(project_dir.name)
+        if cached is not None and _source_fresh(previous_sources.get(rel), tasks_path):
+            projects[project_dir.name] = cached
+            sources[rel] = previous_sources[rel]
+            continue
+        projects[project_dir.name] = {"tasks": parse_project_tasks(tasks_path.read_text(encoding="utf-8"))}
+        sources[rel] = _source_record(tasks_path)
+
+    rows = [[row.get(column, "") for column in columns] for row in open_rows]
+    return {
+        "version": STORE_VERSION,
+        "sources": sources,
+        "columns": columns,
+        "open": rows,
+        "indexes": _build_indexes(rows, columns),
+        "projects": projects,
+    }
+
+
+def write_store(store: Dict, ledger_path: Path, path: Path = STORE_FILE) -> None:
+    """Stamp the ledger's current stat/hash into the store and write it atomically."""
+    store["sources"][LEDGER_SOURCE] = _source_record(ledger_path)
+    write_json_atomic(path, store)
+    track_path(path)
+
+
+def load_store(path: Path = STORE_FILE) -> Optional[Dict]:
+    """Load the store, or None when it is missing, unreadable, or from another version."""
+    try:
+        store = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(store, dict) or store.get("version") != STORE_VERSION:
+        return None
+    return store
+
+
+def open_rows(store: Optional[Dict] = None) -> Optional[List[Dict[str, str]]]:
+    """Open ledger rows as dicts, or None when the store is stale relative to OPENTASKS.md."""
+    store = store if store is not None else load_store()
+    if store is None:
+        return None
+    if not _source_fresh(store["sources"].get(LEDGER_SOURCE), AGENTS_DIR / LEDGER_SOURCE):
+        return None
+    columns = store["columns"]
+    return [dict(zip(columns, row)) for row in store["open"]]
+
+
+def query_open(
+    store: Dict,
+    project: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    task_id: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """Filter open rows through the indexes (case-insensitive except ID)."""
+    indexes = store["indexes"]
+    selected: Optional[set] = None
+    for key, value in (("project", project), ("status", status), ("priority", priority)):
+        if value is None:
+            continue
+        hits = set(indexes[key].get(value.lower(), []))
+        selected = hits if selected is None else selected & hits
+    if task_id is not None:
+        hits = set(indexes["id"].get(task_id, []))
+        selected = hits if selected is None else selected & hits
+    positions = range(len(store["open"])) if selected is None else sorted(selected)
+    columns = store["columns"]
+    return [dict(zip(columns, store["open"][pos])) for pos in positions]
+
+
+def project_tasks(project_dir: Path, store: Optional[Dict] = None) -> Optional[List[Dict]]:
+    """Executor-style tasks for one project, or None when the store is stale for it."""
+    store = store if store is not None else load_store()
+    if store is None:
+        return None
+    entry = store.get("projects", {}).get(project_dir.name)
+    tasks_path = project_dir / "tasks.md"
+    rel = str(tasks_path.relative_to(AGENTS_DIR))
+    if entry is None or not _source_fresh(store["sources"].get(rel), tasks_path):
+        return None
+    return entry["tasks"]
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Run the agent doc generators in one process, optionally as a single commit."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+import collect_opentasks
+import generate_audit
+import generate_sitemap
+from utils import REPO_ROOT, commit_session
+
+GENERATORS = (
+    ("generate_audit.py", lambda: generate_audit.main([])),
+    ("generate_sitemap.py", lambda: generate_sitemap.main([])),
+    ("collect_opentasks.py", lambda: collect_opentasks.main([])),
+)
+
+
+def run_generators() -> int:
+    status = 0
+    for _, generator in GENERATORS:
+        status = generator() or status
+    return status
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Regenerate audits, sitemaps, and OPENTASKS.")
+    parser.add_argument(
+        "--commit",
+        metavar="MESSAGE",
+        help="Stage every generated file and create one commit with this message",
+    )
+    args = parser.parse_args()
+
+    if not args.commit:
+        return run_generators()
+    with commit_session(args.commit, cwd=REPO_ROOT):
+        return run_generators()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,21 @@
 from __future__ import annotations
 
 import datetime as _dt
+import fcntl
+import hashlib
+import json
+import os
 import re
 import subprocess
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 AGENTS_DIR = REPO_ROOT / "agentship-x-htdi"
 TEMPLATES_DIR = AGENTS_DIR / "templates"
+CACHE_DIR = AGENTS_DIR / ".cache"
 
 EXCLUDED_DIRS = {
     ".DS_Store",
@@ -46,13 +53,71 @@ def ensure_dir(path: Path) -> Path:
     return path
 
 
-def read_readme_summary(readme_path: Path, fallback: str | None = None) -> str:
-    """Grab the first descriptive paragraph from a README."""
-    if not readme_path.exists():
-        return fallback or "Summary pending — update the project README."
+def file_digest(*paths: Path) -> str:
+    """Return a sha1 over the contents of the given files (missing files hash as empty)."""
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(str(path.name).encode("utf-8"))
+        digest.update(b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_json_cache(path: Path, version: int) -> Dict:
+    """Load a JSON cache file, returning an empty dict when missing, corrupt, or outdated."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != version:
+        return {}
+    return data
+
+
+def write_json_atomic(path: Path, data: Dict) -> None:
+    """Write compact JSON via a temp file + rename so readers never see a partial file."""
+    ensure_dir(path.parent)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def write_text_atomic(path: Path, content: str) -> None:
+    """Write text via a temp file + rename so readers never see a partial file."""
+    ensure_dir(path.parent)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
 
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on `path` (created if missing) for the duration of the block."""
+    ensure_dir(path.parent)
+    with open(path, "a+b") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def save_json_cache(path: Path, data: Dict, version: int) -> None:
+    """Atomically write a compact JSON cache file."""
+    write_json_atomic(path, dict(data, version=version))
+
+
+SUMMARY_FALLBACK = "Summary pending — update the project README."
+
+
+def readme_summary_from_text(text: str, fallback: str | None = None) -> str:
+    """Return the first descriptive (non-heading) paragraph of README text."""
     lines: List[str] = []
-    for raw_line in readme_path.read_text(encoding="utf-8").splitlines():
+    for raw_line in text.splitlines():
         line = raw_line.strip()
         if not line:
             if lines:
@@ -63,21 +128,47 @@ def read_readme_summary(readme_path: Path, fallback: str | None = None) -> str:
             continue
         lines.append(line)
     summary = " ".join(lines).strip()
-    return summary or (fallback or "Summary pending — update the project README.")
+    return summary or (fallback or SUMMARY_FALLBACK)
+
+
+def readme_title_from_text(text: str) -> str | None:
+    """Return the first heading of README text, or None."""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            return stripped.lstrip("# ").strip()
+    return None
+
+
+def read_readme_summary(readme_path: Path, fallback: str | None = None) -> str:
+    """Grab the first descriptive paragraph from a README."""
+    if not readme_path.exists():
+        return fallback or SUMMARY_FALLBACK
+    return readme_summary_from_text(readme_path.read_text(encoding="utf-8"), fallback)
 
 
 def project_display_name(project_dir: Path) -> str:
     """Derive a friendly name for a project folder."""
     readme = project_dir / "README.md"
     if readme.exists():
-        for line in readme.read_text(encoding="utf-8").splitlines():
-            stripped = line.strip()
-            if stripped.startswith("#"):
-                return stripped.lstrip("# ").strip()
+        title = readme_title_from_text(readme.read_text(encoding="utf-8"))
+        if title is not None:
+            return title
     # Fallback to folder name converted to title case
     return project_dir.name.replace("-", " ").title()
 
 
+def project_readme_info(project_dir: Path) -> Tuple[str, str]:
+    """Read a project's README once and return `(display name, summary)`."""
+    readme = project_dir / "README.md"
+    text = readme.read_text(encoding="utf-8") if readme.exists() else ""
+    title = readme_title_from_text(text)
+    if title is None:
+        title = project_dir.name.replace("-", " ").title()
+    summary = readme_summary_from_text(text) if text else SUMMARY_FALLBACK
+    return title, summary
+
+
 def parse_markdown_table(lines: Iterable[str]) -> Tuple[List[str], List[Dict[str, str]]]:
     """
     Parse a markdown table into headers and row dicts.
@@ -171,19 +262,109 @@ def write_md(path: Path, content: str) -> None:
         normalized.append(line)
     text = "\n".join(normalized).rstrip() + "\n"
     path.write_text(text, encoding="utf-8")
+    track_path(path)
+
+
+class CommitSession:
+    """
+    Collect paths from several generators and commit them in one go.
+
+    Paths are staged with a single `git add --pathspec-from-file`, the index is
+    checked once, and at most one commit is created. Time spent in git is
+    accumulated so callers can report it.
+    """
+
+    def __init__(self, message: str, cwd: Path | None = None) -> None:
+        self.message = message
+        self.cwd = cwd
+        self.paths: List[str] = []
+        self._seen: set[str] = set()
+        self.git_seconds = 0.0
+        self.git_calls = 0
+
+    def add(self, *paths: str | Path) -> None:
+        """Queue paths for staging; duplicates are ignored."""
+        for path in paths:
+            str_path = str(Path(path))
+            if str_path not in self._seen:
+                self._seen.add(str_path)
+                self.paths.append(str_path)
+
+    def _git(self, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        started = time.perf_counter()
+        try:
+            return subprocess.run(["git", *args], cwd=self.cwd, **kwargs)
+        finally:
+            self.git_seconds += time.perf_counter() - started
+            self.git_calls += 1
+
+    def commit(self) -> bool:
+        """Stage queued paths and commit once. Returns True when a commit was made."""
+        if not self.paths:
+            return False
+        pathspec = "\0".join(self.paths) + "\0"
+        self._git(
+            ["add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+            input=pathspec.encode("utf-8"),
+            check=False,
+        )
+        result = self._git(["diff", "--cached", "--quiet"])
+        if result.returncode == 0:
+            print("safe_commit: no staged changes, skipping commit.")
+            return False
+        self._git(["commit", "-m", self.message], check=True)
+        return True
+
+    def report(self) -> str:
+        """Summarize staged path count and git time."""
+        return (
+            f"safe_commit: {len(self.paths)} path(s), "
+            f"{self.git_calls} git call(s), {self.git_seconds:.3f}s in git"
+        )
+
+
+_ACTIVE_SESSION: CommitSession | None = None
+
+
+def track_path(path: str | Path) -> None:
+    """Register a written path with the active commit session, if any."""
+    if _ACTIVE_SESSION is not None:
+        _ACTIVE_SESSION.add(path)
+
+
+@contextmanager
+def commit_session(message: str, cwd: Path | None = None) -> Iterator[CommitSession]:
+    """
+    Batch every `write_md`/`safe_commit` call in the block into one commit.
+
+    The commit only happens when the block exits without an exception.
+    """
+    global _ACTIVE_SESSION
+    previous = _ACTIVE_SESSION
+    session = CommitSession(message, cwd=cwd)
+    _ACTIVE_SESSION = session
+    try:
+        yield session
+    finally:
+        _ACTIVE_SESSION = previous
+    session.commit()
+    print(session.report())
 
 
 def safe_commit(paths: Sequence[str | Path], message: str) -> None:
-    """Stage the provided paths and create a commit when diffs exist."""
-    str_paths = [str(Path(p)) for p in paths]
-    if not str_paths:
+    """Stage the provided paths and create a commit when diffs exist.
+
+    Inside a `commit_session` block the paths are queued for the session's
+    single commit instead.
+    """
+    if not paths:
         return
-    subprocess.run(["git", "add", *str_paths], check=False)
-    result = subprocess.run(["git", "diff", "--cached", "--quiet"])
-    if result.returncode == 0:
-        print("safe_commit: no staged changes, skipping commit.")
+    if _ACTIVE_SESSION is not None:
+        _ACTIVE_SESSION.add(*paths)
         return
-    subprocess.run(["git", "commit", "-m", message], check=True)
+    session = CommitSession(message)
+    session.add(*paths)
+    session.commit()
 
 
 def read_md(path: Path) -> str:
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Watch the repo and regenerate agent docs as files change.
+
+Uses inotify on Linux (through libc, no extra packages) and falls back to
+mtime polling elsewhere. Bursts of events are debounced, and only the
+generators whose inputs changed are rerun:
+
+- `projects/*/tasks.md`, `projects/*/README.md` → OPENTASKS.md (+ OPENTASKS.json)
+- `projects/*/README.md`, `projects/*/sessions/**/*.md`, `templates/AUDIT-log.md` → audits/<project>.md
+- directories created/removed anywhere in the tree, or files changed under
+  `public/assets/` → SITEMAP*.md, ASSET_WEIGHTS.md
+
+Parsed project rows, the audit template, rendered audits, and the sitemap's
+directory tree stay in memory between rebuilds so a refresh only touches what
+changed: a sitemap change re-lists just the affected directories.
+
+Usage:
+    python watch_docs.py [--poll] [--debounce 0.3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import heapq
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import collect_opentasks
+import generate_audit
+import generate_sitemap
+import task_store
+from utils import AGENTS_DIR, REPO_ROOT, TEMPLATES_DIR, write_md
+
+PROJECTS_DIR = AGENTS_DIR / "projects"
+AUDIT_TEMPLATE = TEMPLATES_DIR / "AUDIT-log.md"
+AUDITS_DIR = AGENTS_DIR / "audits"
+# Files the generators write; changes to them must not trigger another rebuild.
+GENERATED = {
+    AGENTS_DIR / "OPENTASKS.md",
+    AGENTS_DIR / "OPENTASKS.json",
+    AGENTS_DIR / "SITEMAP.md",
+    AGENTS_DIR / "SITEMAP_DETAILED.md",
+    generate_sitemap.ASSET_REPORT,
+    generate_sitemap.ASSET_SNAPSHOT,
+}
+IGNORED_DIRS = {AUDITS_DIR, AGENTS_DIR / ".cache"}
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Change:
+    """A filesystem change; `is_dir` marks directory create/delete/move events."""
+
+    __slots__ = ("path", "is_dir")
+
+    def __init__(self, path: Path, is_dir: bool) -> None:
+        self.path = path
+        self.is_dir = is_dir
+
+
+def watched_dirs(root: Path = REPO_ROOT) -> List[Path]:
+    """Every directory the sitemap would list, plus the root."""
+    dirs = [root]
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and not generate_sitemap.should_skip(Path(entry.path)):
+                path = Path(entry.path)
+                dirs.append(path)
+                stack.append(path)
+    return dirs
+
+
+class InotifyWatcher:
+    """Recursive inotify watcher built on libc."""
+
+    def __init__(self, root: Path = REPO_ROOT) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name or not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: Dict[int, Path] = {}
+        for path in watched_dirs(root):
+            self._add(path)
+
+    def _add(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._paths[wd] = path
+
+    def wait(self, timeout: Optional[float]) -> List[Change]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes: List[Change] = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changes.append(Change(REPO_ROOT, True))
+                continue
+            parent = self._paths.get(wd)
+            if parent is None:
+                continue
+            path = parent / name if name else parent
+            is_dir = bool(mask & IN_ISDIR)
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO) and not generate_sitemap.should_skip(path):
+                for sub in watched_dirs(path):
+                    self._add(sub)
+            changes.append(Change(path, is_dir and not mask & (IN_MODIFY | IN_CLOSE_WRITE)))
+        return changes
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: compare directory listings and input-file mtimes every interval."""
+
+    def __init__(self, root: Path = REPO_ROOT, interval: float = 1.0) -> None:
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, float]:
+        snapshot: Dict[Path, float] = {}
+        for directory in watched_dirs(self.root):
+            snapshot[directory] = -1.0
+        for path in [
+            AUDIT_TEMPLATE,
+            *PROJECTS_DIR.glob("*/tasks.md"),
+            *PROJECTS_DIR.glob("*/README.md"),
+            *PROJECTS_DIR.glob("*/sessions/**/*.md"),
+        ]:
+            try:
+                snapshot[path] = path.stat().st_mtime
+            except OSError:
+                continue
+        for directory in snapshot.copy():
+            if directory.is_relative_to(generate_sitemap.ASSET_ROOT) and snapshot[directory] < 0:
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if entry.is_file() and not generate_sitemap.should_skip(entry):
+                                snapshot[Path(entry.path)] = entry.stat().st_mtime
+                except OSError:
+                    continue
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> List[Change]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._scan()
+        previous, self._snapshot = self._snapshot, current
+        changes = [
+            Change(path, stamp < 0)
+            for path, stamp in current.items()
+            if previous.get(path) != stamp
+        ]
+        changes.extend(Change(path, stamp < 0) for path, stamp in previous.items() if path not in current)
+        return changes
+
+    def close(self) -> None:
+        pass
+
+
+class DocState:
+    """In-memory generator state reused across rebuilds."""
+
+    def __init__(self) -> None:
+        self.template = generate_audit.AuditTemplate(generate_audit.load_template())
+        self.rows: Dict[str, List[Dict[str, str]]] = {}
+        self.audits: Dict[str, str] = {}
+        self.tree = generate_sitemap.scan_tree()
+        for project_dir in self._project_dirs():
+            self._refresh_project(project_dir, tasks=True, audit=True)
+
+    @staticmethod
+    def _project_dirs() -> List[Path]:
+        return [path for path in sorted(PROJECTS_DIR.iterdir()) if path.is_dir()]
+
+    def _refresh_project(self, project_dir: Path, tasks: bool, audit: bool) -> None:
+        name = project_dir.name
+        if not project_dir.is_dir():
+            self.rows.pop(name, None)
+            self.audits.pop(name, None)
+            return
+        if tasks:
+            if (project_dir / "tasks.md").exists():
+                self.rows[name] = collect_opentasks.collect_project(project_dir)
+            else:
+                self.rows.pop(name, None)
+        if audit:
+            self.audits[name] = generate_audit.render_project_audit(project_dir, self.template)
+
+    def write_opentasks(self) -> None:
+        merged = list(heapq.merge(*(self.rows[name] for name in sorted(self.rows)), key=collect_opentasks.row_sort_key))
+        write_md(collect_opentasks.TARGET_FILE, collect_opentasks.render_ledger(merged))
+        dirs = [PROJECTS_DIR / name for name in sorted(self.rows)]
+        store = task_store.build_store(merged, collect_opentasks.COLUMNS, dirs, previous=task_store.load_store())
+        task_store.write_store(store, collect_opentasks.TARGET_FILE)
+
+    def write_audits(self, names: Set[str]) -> int:
+        written = 0
+        for name in sorted(names):
+            content = self.audits.get(name)
+            if content is None:
+                continue
+            output_path = AUDITS_DIR / f"{name}.md"
+            if output_path.exists() and output_path.read_text(encoding="utf-8") == content:
+                continue
+            write_md(output_path, content)
+            written += 1
+        return written
+
+    def apply(self, changes: List[Change]) -> List[str]:
+        """Rerun only the generators affected by `changes`; returns the names of those that ran."""
+        task_projects: Set[str] = set()
+        audit_projects: Set[str] = set()
+        sitemap_dirs: Set[Path] = set()
+        rescan = False
+
+        for change in changes:
+            path = change.path
+            if path in GENERATED or any(parent in IGNORED_DIRS for parent in path.parents):
+                continue
+            if path == REPO_ROOT:
+                rescan = True  # inotify queue overflowed; events were lost
+            elif change.is_dir or path.is_relative_to(generate_sitemap.ASSET_ROOT):
+                sitemap_dirs.add(path.parent)
+            if path == AUDIT_TEMPLATE:
+                self.template = generate_audit.AuditTemplate(generate_audit.load_template())
+                audit_projects.update(p.name for p in self._project_dirs())
+                continue
+            try:
+                rel = path.relative_to(PROJECTS_DIR)
+            except ValueError:
+                continue
+            project = rel.parts[0]
+            if len(rel.parts) == 1 or rel.parts[1:] == ("README.md",):
+                task_projects.add(project)
+                audit_projects.add(project)
+            elif rel.parts[1:] == ("tasks.md",):
+                task_projects.add(project)
+            elif rel.parts[1:2] == ("sessions",):
+                audit_projects.add(project)
+
+        ran: List[str] = []
+        for project in task_projects | audit_projects:
+            self._refresh_project(
+                PROJECTS_DIR / project,
+                tasks=project in task_projects,
+                audit=project in audit_projects,
+            )
+        if task_projects:
+            self.write_opentasks()
+            ran.append("collect_opentasks")
+        if audit_projects:
+            self.write_audits(audit_projects)
+            ran.append("generate_audit")
+        if rescan or sitemap_dirs:
+            if rescan:
+                self.tree = generate_sitemap.scan_tree()
+            else:
+                for directory in sorted(sitemap_dirs):
+                    generate_sitemap.refresh_dir(self.tree, directory)
+            generate_sitemap.write_outputs(self.tree)
+            ran.append("generate_sitemap")
+        return ran
+
+
+def make_watcher(force_poll: bool, interval: float):
+    if not force_poll:
+        try:
+            return InotifyWatcher()
+        except OSError as exc:
+            print(f"inotify unavailable ({exc}); falling back to polling.")
+    return PollingWatcher(interval=interval)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Regenerate agent docs whenever their inputs change.")
+    parser.add_argument("--poll", action="store_true", help="Use mtime polling instead of inotify")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Quiet period before rebuilding (seconds)")
+    args = parser.parse_args(argv)
+
+    state = DocState()
+    watcher = make_watcher(args.poll, args.interval)
+    print(f"Watching {REPO_ROOT} with {type(watcher).__name__} (Ctrl+C to stop)")
+    try:
+        while True:
+            changes = watcher.wait(None)
+            if not changes:
+                continue
+            # Debounce: keep collecting until the tree has been quiet for a full window.
+            while True:
+                more = watcher.wait(args.debounce)
+                if not more:
+                    break
+                changes.extend(more)
+            started = time.perf_counter()
+            ran = state.apply(changes)
+            if ran:
+                elapsed = (time.perf_counter() - started) * 1000
+                print(f"↻ {', '.join(ran)} in {elapsed:.1f} ms ({len(changes)} event(s))")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
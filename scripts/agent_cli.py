@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import json
 import os
+import sqlite3
 import subprocess
 import sys
 import tempfile
@@ -36,6 +37,9 @@ except ImportError as exc:
 
 ROOT = Path(__file__).resolve().parent.parent
 AGENTS_DIR = ROOT / "agentship-x-htdi"
+sys.path.append(str(AGENTS_DIR / "scripts"))
+import search_index  # noqa: E402
+import task_store  # noqa: E402
 PROMPTS_DIR = AGENTS_DIR / "prompts"
 GEMINI_TRIAGE_LIBRARY = PROMPTS_DIR / "gemini_triage.json"
 WORKFLOWS_DIR = ROOT / ".github" / "workflows"
@@ -45,6 +49,7 @@ CODEX_MODEL = "gpt-5.1-codex"
 GEMINI_MODEL = "gemini-2.5-flash"
 JULES_USAGE_FILE = AGENTS_DIR / "logs" / "jules-usage.json"
 JULES_DAILY_LIMIT = 15
+PRIOR_CONTEXT_HITS = 5
 console = Console()
 BANNER = r"""
    ____ ___   ____  ______   ____  _       ____  _   _ _______ ____   _____ _____ ____  
@@ -213,6 +218,22 @@ def read_opentasks() -> List[OpenTask]:
     if not path.exists():
         raise SystemExit("agents/OPENTASKS.md not found.")
 
+    stored = task_store.open_rows()
+    if stored is not None:
+        return [
+            OpenTask(
+                project=row["Project"],
+                status=row["Status"],
+                task_id=row["ID"],
+                title=row["Title"],
+                description=row["Description"],
+                priority=row["Priority"],
+                owner=row["Owner"],
+                notes=row["Notes"],
+            )
+            for row in stored
+        ]
+
     rows: List[OpenTask] = []
     for line in path.read_text(encoding="utf-8").splitlines():
         if not line.startswith("|") or line.startswith("| ---"):
@@ -500,6 +521,29 @@ def compose_prompt(task: OpenTask, table_text: str) -> str:
     )
 
 
+def prior_context_block(task: OpenTask) -> str:
+    """Ranked snippets from earlier sessions, handoffs, and audits related to the task."""
+    try:
+        conn = search_index.connect()
+        try:
+            search_index.update_index(conn)
+            hits = search_index.search(
+                conn, f"{task.task_id} {task.title}", limit=PRIOR_CONTEXT_HITS, any_term=True
+            )
+        finally:
+            conn.close()
+    except sqlite3.Error as exc:
+        console.print(f"[yellow]Prior context search unavailable ({exc}). Using base prompt.[/]")
+        return ""
+    if not hits:
+        return ""
+    lines = ["Prior context (top matches from agents/scripts/search_index.py):"]
+    for row in hits:
+        snippet = " ".join(row["snippet"].split())
+        lines.append(f"- [{row['kind']}] {row['title']} — agents/{row['path']}: {snippet}")
+    return "\n".join(lines)
+
+
 def load_jules_usage() -> Dict[str, int]:
     if not JULES_USAGE_FILE.exists():
         return {}
@@ -680,6 +724,10 @@ def run_model_mode(tasks: List[OpenTask]) -> None:
         )
     )
     base_prompt = compose_prompt(task, table_text)
+    prior_context = prior_context_block(task)
+    if prior_context:
+        console.print(f"[cyan]Attached {prior_context.count(chr(10))} prior context match(es) to the prompt.[/]")
+        base_prompt = f"{base_prompt.rstrip()}\n\n{prior_context}\n"
     prompts_by_runner: Dict[str, str] = {key: base_prompt for key in model_keys}
 
     if "gemini" in model_keys:
@@ -1,13 +1,38 @@
 // src/Level.js
 import * as THREE from "three"; // <--- NEW: Import THREE for Vector3
 import { game_config as conf } from "./game_config.js";
+import { decodeLevelPack } from "./utils/LevelPack.js";
 
-// Helper to fetch level JSON by name (e.g., "lvl_code")
+// Helper to fetch level data by name (e.g., "lvl_code").
+// Prefers the packed `.lvlb` file (npm run levels:pack) and falls back to the JSON source.
+// Logs fetch and parse times so the two formats can be compared in the browser.
 export async function loadLevelData(levelName) {
-  const url = `/src/data/level/${levelName}.json`;
-  const resp = await fetch(url);
+  const started = performance.now();
+  const packed = await fetch(`/data/level/${levelName}.lvlb`);
+  if (packed.ok) {
+    const buffer = await packed.arrayBuffer();
+    const fetched = performance.now();
+    try {
+      const data = decodeLevelPack(buffer);
+      console.log(
+        `[Level.js] ${levelName}.lvlb: ${buffer.byteLength} bytes, fetch ${(fetched - started).toFixed(1)} ms, decode ${(performance.now() - fetched).toFixed(2)} ms`,
+      );
+      return data;
+    } catch (error) {
+      console.warn(`[Level.js] Could not decode ${levelName}.lvlb, loading JSON instead:`, error);
+    }
+  }
+
+  const jsonStarted = performance.now();
+  const resp = await fetch(`/data/level/${levelName}.json`);
   if (!resp.ok) throw new Error(`Could not load level: ${levelName}`);
-  return await resp.json();
+  const text = await resp.text();
+  const fetched = performance.now();
+  const data = JSON.parse(text);
+  console.log(
+    `[Level.js] ${levelName}.json: ${text.length} bytes, fetch ${(fetched - jsonStarted).toFixed(1)} ms, parse ${(performance.now() - fetched).toFixed(2)} ms`,
+  );
+  return data;
 }
 
 export class Level {
@@ -26,6 +51,9 @@ export class Level {
 
     this.scene = null; // <--- NEW: Reference to the Three.js scene this level belongs to
 
+    // Spawn cells precomputed by agentship-x-htdi/scripts/level_index.py, if present
+    this.spawnCells = levelData.spawns || null;
+
     // Spawns will be stored as world coordinates
     this.playerSpawns = this._extractSpawns("player_sp");
     this.weaponSpawns = this._extractSpawns("weapon_sp");
@@ -50,6 +78,10 @@ export class Level {
    * @returns {Array<THREE.Vector3>} An array of world coordinate vectors for spawn points.
    */
   _extractSpawns(layerName) {
+    const precomputed = this.spawnCells?.[layerName];
+    if (precomputed) {
+      return precomputed.map(([gridX, gridY]) => this._cellToWorld(gridX, gridY));
+    }
     const layer = this.layers.find((l) => l.name === layerName);
     if (!layer || !layer.data) return [];
     const cols = this.width;
@@ -57,22 +89,29 @@ export class Level {
     for (let i = 0; i < layer.data.length; ++i) {
       // Check if tile is not empty (Tiled exports empty tiles as -1 or 0 depending on version)
       if (layer.data[i] >= 0) {
-        const gridX = i % cols;
-        const gridY = Math.floor(i / cols);
-
-        // Convert grid coordinates to world coordinates (centered on tile)
-        // mapWidth/2 and mapHeight/2 offset to center the whole level around (0,0)
-        // (this.height - 1 - gridY) converts Tiled's top-left origin to bottom-left (Y-up)
-        const worldX = gridX - this.width / 2 + 0.5;
-        const worldY = this.height - 1 - gridY - this.height / 2 + 0.5;
-        const worldZ = 0; // Assuming 2D game in XY plane, Z is 0
-
-        spawns.push(new THREE.Vector3(worldX, worldY, worldZ));
+        spawns.push(this._cellToWorld(i % cols, Math.floor(i / cols)));
       }
     }
     return spawns;
   }
 
+  /**
+   * Converts a tile cell (Tiled's top-left origin) to the world coordinates of its center.
+   * @param {number} gridX - Tile column.
+   * @param {number} gridY - Tile row, counted from the top.
+   * @returns {THREE.Vector3} World position of the cell center.
+   */
+  _cellToWorld(gridX, gridY) {
+    // Convert grid coordinates to world coordinates (centered on tile)
+    // mapWidth/2 and mapHeight/2 offset to center the whole level around (0,0)
+    // (this.height - 1 - gridY) converts Tiled's top-left origin to bottom-left (Y-up)
+    const worldX = gridX - this.width / 2 + 0.5;
+    const worldY = this.height - 1 - gridY - this.height / 2 + 0.5;
+    const worldZ = 0; // Assuming 2D game in XY plane, Z is 0
+
+    return new THREE.Vector3(worldX, worldY, worldZ);
+  }
+
   getTileAt(layerName, x, y) {
     const layer = this.layers.find((l) => l.name === layerName);
     if (!layer) return -1;
@@ -1,6 +1,6 @@
 // src/World.js
 import * as THREE from "three";
-import { Level } from "@/Level.js";
+import { Level, loadLevelData } from "@/Level.js";
 import { LoaderManager } from "@/LoaderManager.js";
 
 const LEVEL_NAMES = ["lvl_code", "lvl_ballpit", "lvl_basement", "lvl_google"];
@@ -27,15 +27,14 @@ export async function loadLevelAsync(scene, lvlIndex = 0) {
   console.log("[World.js] LoaderManager manifest loaded.");
 
   const levelName = LEVEL_NAMES[lvlIndex] || LEVEL_NAMES[0];
-  const res = await fetch(`/data/level/${levelName}.json`);
-  if (!res.ok) {
-    console.error(
-      `[World.js] Failed to fetch level data for ${levelName}: HTTP ${res.status}`,
-    );
+  let json;
+  try {
+    json = await loadLevelData(levelName);
+  } catch (error) {
+    console.error(`[World.js] Failed to fetch level data for ${levelName}:`, error);
     throw new Error(`Could not load level data: ${levelName}`);
   }
-  const json = await res.json();
-  console.log(`[World.js] Level JSON data loaded for ${levelName}.`);
+  console.log(`[World.js] Level data loaded for ${levelName}.`);
 
   Level.ActiveLevel = new Level(json);
   Level.ActiveLevel.setScene(scene); // Set the scene reference
@@ -0,0 +1,81 @@
+// src/utils/LevelPack.js
+// Decoder for the packed `.lvlb` levels written by agentship-x-htdi/scripts/level_pack.py.
+// Keep the constants below in sync with that script.
+
+const MAGIC = "LVLB";
+const FORMAT_VERSION = 1;
+const HEADER_BYTES = 18; // magic, version u8, layer count u8, 4 x u16 sizes, metadata length u32
+const LAYER_HEADER_BYTES = 9; // encoding u8, cell count u32, payload length u32
+
+const RAW_I8 = 0;
+const RAW_I16 = 1;
+const RLE_I8 = 2;
+const RLE_I16 = 3;
+
+/*
+ * Decode one layer's payload into a typed array of tile values.
+ */
+function decodeLayer(view, encoding, cells, offset, length) {
+  const wide = encoding === RAW_I16 || encoding === RLE_I16;
+  const data = wide ? new Int16Array(cells) : new Int8Array(cells);
+  let filled = 0;
+
+  if (encoding === RAW_I8) {
+    data.set(new Int8Array(view.buffer, view.byteOffset + offset, length));
+    filled = length;
+  } else if (encoding === RAW_I16) {
+    filled = length / 2;
+    for (let i = 0; i < filled; i++) data[i] = view.getInt16(offset + i * 2, true);
+  } else if (encoding === RLE_I8 || encoding === RLE_I16) {
+    const pairBytes = wide ? 4 : 2;
+    for (let pos = offset; pos < offset + length; pos += pairBytes) {
+      const run = wide ? view.getUint16(pos, true) : view.getUint8(pos);
+      const value = wide ? view.getInt16(pos + 2, true) : view.getInt8(pos + 1);
+      data.fill(value, filled, filled + run);
+      filled += run;
+    }
+  } else {
+    throw new Error(`Unknown layer encoding ${encoding}`);
+  }
+
+  if (filled !== cells) {
+    throw new Error(`Layer decoded to ${filled} cells, header says ${cells}`);
+  }
+  return data;
+}
+
+/*
+ * Decode a packed level into the same shape as its JSON source.
+ * Layer `data` arrives as an Int8Array/Int16Array instead of a plain array.
+ */
+function decodeLevelPack(buffer) {
+  const view = new DataView(buffer);
+  if (buffer.byteLength < HEADER_BYTES) throw new Error("Packed level is shorter than its header");
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) throw new Error("Not a packed level (bad magic)");
+  const version = view.getUint8(4);
+  if (version !== FORMAT_VERSION) throw new Error(`Unsupported packed level version ${version}`);
+
+  const layerCount = view.getUint8(5);
+  const metaLength = view.getUint32(14, true);
+  let pos = HEADER_BYTES;
+  const level = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, pos, metaLength)));
+  pos += metaLength;
+
+  const layers = level.layers || [];
+  if (layers.length !== layerCount) {
+    throw new Error(`Metadata lists ${layers.length} layers, header says ${layerCount}`);
+  }
+  for (const layer of layers) {
+    const encoding = view.getUint8(pos);
+    const cells = view.getUint32(pos + 1, true);
+    const length = view.getUint32(pos + 5, true);
+    pos += LAYER_HEADER_BYTES;
+    layer.data = decodeLayer(view, encoding, cells, pos, length);
+    pos += length;
+  }
+  if (pos !== buffer.byteLength) throw new Error(`${buffer.byteLength - pos} trailing byte(s) in packed level`);
+  return level;
+}
+
+export { decodeLevelPack };